@@ -18,37 +18,40 @@ import json
 import time
 import logging
 import argparse
-import requests
+import csv
+import uuid
+import random
+import subprocess
+import copy
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterator, TYPE_CHECKING
+from dataclasses import dataclass, asdict, replace
+from datetime import datetime, timezone
 import re
+import heapq
 import statistics
-
-# Core libraries
-import openai
-from scholarly import scholarly
-import arxiv
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.corpus import stopwords
-from textstat import flesch_reading_ease
-
-# Document processing
-from docx import Document
-from docx.shared import Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-import markdown2
-
-# Citation and bibliography
-from pybtex.database import BibliographyData, Entry
-from pybtex.style.formatting.alpha import Style
-from pybtex.backends.latex import Backend
+from collections import Counter
+import hashlib
+import zlib
+import sqlite3
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, as_completed, FIRST_COMPLETED
 
 # Configuration and utilities
 import yaml
-from tqdm import tqdm
+
+# Heavy dependencies (requests, openai, scholarly, arxiv, nltk, textstat, python-docx, tqdm, numpy, tiktoken)
+# are imported by the stage that needs them so --help and markdown-only runs start fast.
+# Keep it that way: `--benchmark import` fails if any of them load at import time.
+HEAVY_MODULES = ["requests", "openai", "scholarly", "arxiv", "nltk", "textstat", "docx", "tqdm", "numpy", "tiktoken"]
+
+if TYPE_CHECKING:  # Names for string annotations only; never imported at runtime
+    import arxiv
+    import numpy as np
+    import requests
 
 # Setup logging with better formatting
 logging.basicConfig(
@@ -56,12 +59,22 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
         logging.StreamHandler(sys.stdout),
-        logging.FileHandler('article_generator.log')
+        logging.FileHandler('article_generator.log', delay=True)  # Opened on first record
     ]
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
+_current_year = {"year": 0, "checked": 0.0}
+
+def current_year() -> int:
+    """Current calendar year, read from the clock at most once a minute"""
+    now = time.monotonic()
+    if not _current_year["year"] or now - _current_year["checked"] > 60:
+        _current_year["year"] = datetime.now().year
+        _current_year["checked"] = now
+    return _current_year["year"]
+
+@dataclass(slots=True)
 class ResearchPaper:
     """Enhanced data structure for a research paper"""
     title: str
@@ -76,11 +89,16 @@ class ResearchPaper:
     relevance_score: float = 0.0
     quality_score: float = 0.0
     source: str = ""  # Track which database this came from
+    arxiv_id: str = ""  # Version-less arXiv identifier, when known
     
     def __post_init__(self):
         if self.key_findings is None:
             self.key_findings = []
         
+        # Venues and sources repeat across papers; share one string for each
+        self.venue = sys.intern(self.venue) if self.venue else self.venue
+        self.source = sys.intern(self.source) if self.source else self.source
+        
         # Calculate quality score based on multiple factors
         self.quality_score = self._calculate_quality_score()
     
@@ -115,14 +133,31 @@ class ResearchPaper:
             score += 0.5
         
         # Recency bonus (papers from last 5 years get bonus)
-        current_year = datetime.now().year
-        if current_year - self.year <= 5:
+        age = current_year() - self.year
+        if age <= 5:
             score += 1.0
-        elif current_year - self.year <= 10:
+        elif age <= 10:
             score += 0.5
         
         return score
 
+class PaperColumns:
+    """Numeric paper fields as NumPy arrays, so filters run as masks instead of per-object loops"""
+    
+    def __init__(self, papers: List[ResearchPaper]):
+        import numpy as np
+        
+        n = len(papers)
+        self.years = np.fromiter((p.year for p in papers), dtype=np.int32, count=n)
+        self.citations = np.fromiter((p.citations or 0 for p in papers), dtype=np.int64, count=n)
+        self.quality = np.fromiter((p.quality_score for p in papers), dtype=np.float64, count=n)
+        self.relevance = np.fromiter((p.relevance_score for p in papers), dtype=np.float64, count=n)
+        self.abstract_words = np.fromiter((len(p.abstract.split()) if p.abstract else 0 for p in papers),
+                                          dtype=np.int32, count=n)
+    
+    def __len__(self) -> int:
+        return len(self.years)
+
 @dataclass
 class ArticleSection:
     """Enhanced data structure for an article section"""
@@ -131,6 +166,7 @@ class ArticleSection:
     word_count: int = 0
     citations: List[str] = None
     quality_score: float = 0.0
+    fallback: bool = False  # Placeholder text used when generation failed
     
     def __post_init__(self):
         if self.citations is None:
@@ -163,11 +199,69 @@ class ArticleSection:
         
         return score
 
+class Tracer:
+    """Lightweight timing spans for one article run, exportable as a Chrome trace"""
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.spans = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+    
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Time a block; the yielded dict can be filled with attributes inside it"""
+        if not self.enabled:
+            yield attrs
+            return
+        start = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.spans.append({
+                    "name": name,
+                    "start_ms": round((start - self._origin) * 1000, 3),
+                    "duration_ms": round((end - start) * 1000, 3),
+                    "thread": threading.current_thread().name,
+                    "tid": threading.get_ident(),
+                    "args": dict(attrs)
+                })
+    
+    def summary(self) -> List[Dict[str, Any]]:
+        """Spans in start order, suitable for result stats"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start_ms"])
+        return [{k: v for k, v in span.items() if k != "tid"} for span in spans]
+    
+    def export_chrome_trace(self, path: str) -> str:
+        """Write spans in Chrome trace event format (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        with self._lock:
+            events = [{
+                "name": span["name"],
+                "cat": span["name"].split(".")[0],
+                "ph": "X",
+                "ts": round(span["start_ms"] * 1000),
+                "dur": round(span["duration_ms"] * 1000),
+                "pid": pid,
+                "tid": span["tid"],
+                "args": span["args"]
+            } for span in self.spans]
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+        return str(path)
+
 class Config:
     """Enhanced configuration management with validation"""
-    def __init__(self, config_path: str = "config.yaml"):
+    def __init__(self, config_path: str = "config.yaml", provider: Optional[str] = None):
         self.config_path = config_path
         self.config = self._load_config()
+        if provider:
+            # Command-line override; applied before validation so its checks match the provider in use
+            self.config.setdefault("generation", {})["provider"] = provider
         self._validate_config()
     
     def _load_config(self) -> Dict[str, Any]:
@@ -186,12 +280,37 @@ class Config:
                 "search_sources": ["semantic_scholar", "arxiv"],
                 "quality_threshold": 2.0,  # Minimum quality score
                 "min_abstract_length": 50,  # Minimum words in abstract
-                "max_results_per_source": 15
+                "max_results_per_source": 15,
+                "source_timeout": 45,  # Seconds allowed for each source
+                "total_timeout": 90,  # Seconds allowed for the whole search
+                "source_timeouts": {},  # Optional per-source overrides
+                "bm25": {"k1": 1.5, "b": 0.75},  # Relevance scoring parameters
+                "corpus": {  # Local store of every paper fetched so far
+                    "mode": "first",  # off, first (local papers first, remote APIs top up) or offline
+                    "path": "cache/corpus",
+                    "min_local_results": 30,  # Remote sources are skipped when the corpus has this many matches
+                    "max_local_results": 60,
+                    "min_term_coverage": 0.5,  # Share of the query's IDF weight a local paper must match
+                    "reindex_after": 200  # Unindexed papers tolerated before postings are rebuilt
+                },
+                "dedup": {  # Near-duplicate detection across sources
+                    "num_perm": 64,  # MinHash signature length
+                    "bands": 16,  # LSH bands (num_perm must divide evenly)
+                    "threshold": 0.5  # Estimated Jaccard similarity to merge
+                }
             },
             "generation": {
+                "provider": "openai",  # "stub" generates deterministic text offline
+                "stub": {
+                    "latency_ms": 50,  # Before the first token
+                    "tokens_per_second": 0,  # Streaming speed; 0 is instant
+                    "error_rate": 0.0,  # Share of requests that fail
+                    "words": 0,  # Completion length; 0 follows the prompt's target
+                    "seed": 0
+                },
                 "model": "gpt-5-mini", #changed from gpt-4
                 "temperature": 1.0, #1.0,
-                "max_completion_tokens": 3500,  # Increased from 2000
+                "max_completion_tokens": 3500,  # Upper bound; each section asks for what its target needs
                 "retry_attempts": 1,
                 "target_word_counts": {
                     "abstract": 250,
@@ -201,7 +320,54 @@ class Config:
                     "results": 800,
                     "conclusion": 400
                 },
-                "fallback_model": "gpt-4-turbo"
+                "fallback_model": "gpt-4-turbo",
+                "client": {  # Shared OpenAI HTTP client settings
+                    "timeout": 180,
+                    "connect_timeout": 10,
+                    "max_retries": 2,
+                    "max_connections": 20,
+                    "max_keepalive_connections": 10
+                },
+                "completion_budget": {  # Completion tokens derived from target_word_counts
+                    "tokens_per_word": 1.4,
+                    "headroom": 1.5,  # Room to overshoot the target
+                    "overhead_tokens": 1024,  # Reasoning tokens spent before the text
+                    "min_tokens": 512,
+                    # Reasoning models count hidden reasoning against the limit; never go below the old flat limit
+                    "reasoning_models": ["gpt-5", "o1", "o3", "o4"],  # Model name prefixes
+                    "reasoning_min_tokens": 3500
+                },
+                "context_budget_tokens": 1500,  # Prompt tokens for the research context
+                # "shared_prefix": system message and context identical for every section, so
+                # provider prompt caching reuses them; "inline": context inside each section prompt
+                "prompt_layout": "shared_prefix",
+                "shared_context_budget_tokens": 3000,  # Context packed once per article in shared_prefix
+                "repair": {  # Fix length failures instead of regenerating the whole section
+                    "enabled": True,
+                    "max_continuations": 2  # Follow-up requests that extend a short section
+                },
+                "streaming": {
+                    "enabled": True,  # Validate while streaming and abort doomed completions early
+                    "write_partial": True  # Stream accepted text to outputs/partial/<article>/<section>.md
+                },
+                "context_budgets": {  # Per-section overrides
+                    "title": 600,
+                    "literature_review": 2500
+                },
+                "concurrency": 3,  # Sections generated in parallel (1 = sequential)
+                "section_timeout": 300  # Seconds before a section is cancelled and replaced by fallback text
+            },
+            "content": {
+                "keywords": {  # Lists of terms, or paths to files with one term per line; empty uses built-ins
+                    "themes": [],
+                    "methodologies": [],
+                    "trends": []
+                },
+                "segmenter": "rules",  # Sentence splitter: rules (fast, built in) or punkt (NLTK)
+                "findings": {
+                    "process_threshold": 200,  # Uncached abstracts needed before a process pool is used
+                    "processes": 0  # Worker processes for large batches (0 = one per CPU)
+                }
             },
             "output": {
                 "format": ["docx", "markdown","pdf"],
@@ -209,6 +375,51 @@ class Config:
                 "template_path": "templates/apa7_template.docx",
                 "include_summary": True
             },
+            "http": {
+                "pool_maxsize": 10,  # Keep-alive connections per API
+                "max_retries": 3,
+                "backoff_factor": 1.0,  # Seconds, doubled on each retry
+                "rate_limits": {  # Requests per second and burst size shared by all callers
+                    "semantic_scholar": {"rate": 1.0, "burst": 3},
+                    "arxiv": {"rate": 0.33, "burst": 1}
+                }
+            },
+            "cache": {
+                "search": {
+                    "enabled": True,
+                    "path": "cache/search_cache.sqlite",
+                    "ttl_hours": 72,  # Results older than this are refetched
+                    "max_mb": 64  # Least recently used entries are evicted beyond this
+                },
+                "llm": {
+                    "enabled": True,
+                    "path": "cache/llm_cache.sqlite",
+                    "max_mb": 256,
+                    "read_only": False  # Replay cached completions without storing new ones
+                },
+                "findings": {
+                    "enabled": True,
+                    "path": "cache/findings_cache.sqlite",
+                    "max_mb": 32
+                }
+            },
+            "batch": {
+                "workers": 2  # Articles generated in parallel in --batch mode
+            },
+            "service": {
+                "host": "127.0.0.1",
+                "port": 8080,
+                "workers": 2,  # Jobs generated in parallel by --serve
+                "queue_path": "cache/jobs.sqlite"
+            },
+            "checkpoint": {
+                "enabled": True,  # Persist each stage so --resume RUN_ID can skip it
+                "dir": "runs"
+            },
+            "tracing": {
+                "enabled": True,  # Per-stage spans in result stats
+                "export_dir": ""  # Write a Chrome trace per article here when set
+            },
             "quality": {
                 "min_section_words": 100,
                 "max_section_words": 2500,
@@ -244,7 +455,7 @@ class Config:
     def _validate_config(self):
         """Validate configuration values"""
         # Check required API keys
-        if not self.get("apis.openai_api_key"):
+        if not self.get("apis.openai_api_key") and self.get("generation.provider", "openai") == "openai":
             logger.warning("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
         
         # Validate search parameters
@@ -254,7 +465,8 @@ class Config:
         
         # Validate model
         model = self.get("generation.model", "gpt-5-mini")
-        if model not in ["gpt-5","gpt-5-mini","gpt-4", "gpt-3.5-turbo", "gpt-4-turbo"]:
+        if self.get("generation.provider", "openai") == "openai" and \
+                model not in ["gpt-5","gpt-5-mini","gpt-4", "gpt-3.5-turbo", "gpt-4-turbo"]:
             logger.warning(f"Unknown model: {model}")
     
     def get(self, key: str, default=None):
@@ -328,14 +540,19 @@ class TopicRefiner:
         }
     
     @staticmethod
-    def _extract_search_terms(topic: str) -> List[str]:
-        """Extract meaningful search terms from topic"""
+    def topic_terms(topic: str) -> List[str]:
+        """The topic's own content words, without the academic terms added for remote search"""
         # Remove common stopwords and short words
         stopwords_set = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
         
         # Split and clean
         words = re.findall(r'\b\w+\b', topic.lower())
-        search_terms = [word for word in words if len(word) > 2 and word not in stopwords_set]
+        return [word for word in words if len(word) > 2 and word not in stopwords_set]
+    
+    @staticmethod
+    def _extract_search_terms(topic: str) -> List[str]:
+        """Extract meaningful search terms from topic"""
+        search_terms = TopicRefiner.topic_terms(topic)
         
         # Add some related academic terms
         academic_terms = ['research', 'study', 'analysis', 'review']
@@ -343,36 +560,729 @@ class TopicRefiner:
         
         return search_terms[:8]  # Limit to 8 terms
 
+class DiskCache:
+    """SQLite-backed key/value store with TTL expiry and LRU eviction by size"""
+    
+    def __init__(self, path: str, ttl_seconds: float = 0, max_bytes: int = 0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds  # 0 disables expiry
+        self.max_bytes = max_bytes  # 0 disables eviction
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed)")
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the stored value, or None if it is missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, size, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, size, created = row
+            if self.ttl_seconds and now - created > self.ttl_seconds:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._total_bytes -= size
+                return None
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+    
+    def set(self, key: str, value: Any):
+        """Store a JSON-serializable value and evict entries beyond the byte budget"""
+        payload = json.dumps(value)
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._total_bytes -= row[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, now, now)
+            )
+            self._total_bytes += size
+            self._evict(now)
+    
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used ones until under budget"""
+        if self.ttl_seconds:
+            expired = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries WHERE created < ?",
+                (now - self.ttl_seconds,)
+            ).fetchone()
+            if expired[1]:
+                self._conn.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl_seconds,))
+                self._total_bytes -= expired[0]
+        
+        if not self.max_bytes or self._total_bytes <= self.max_bytes:
+            return
+        
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed ASC"):
+            if self._total_bytes <= self.max_bytes:
+                break
+            victims.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        logger.debug(f"Evicted {len(victims)} entries from {self.path}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Summarize the store's size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {"entries": entries, "bytes": self._total_bytes}
+
+class SearchCache:
+    """Persistent cache of parsed search results keyed by source, query, limit and fields"""
+    
+    def __init__(self, config: Config):
+        self.enabled = config.get("cache.search.enabled", True)
+        self._store = None
+        if self.enabled:
+            try:
+                self._store = DiskCache(
+                    config.get("cache.search.path", "cache/search_cache.sqlite"),
+                    ttl_seconds=config.get("cache.search.ttl_hours", 72) * 3600,
+                    max_bytes=int(config.get("cache.search.max_mb", 64) * 1024 * 1024)
+                )
+            except Exception as e:
+                logger.warning(f"Search cache unavailable, continuing without it: {e}")
+                self.enabled = False
+    
+    @staticmethod
+    def make_key(source: str, query: str, limit: int, fields: str = "") -> str:
+        """Build a stable key from the normalized request parameters"""
+        normalized_query = " ".join(re.findall(r'\w+', query.lower()))
+        raw = json.dumps([source, normalized_query, limit, fields])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def get(self, source: str, query: str, limit: int, fields: str = "") -> Optional[List[ResearchPaper]]:
+        """Return cached papers for a request, or None on a miss"""
+        if not self._store:
+            return None
+        try:
+            records = self._store.get(self.make_key(source, query, limit, fields))
+            if records is None:
+                return None
+            return [ResearchPaper(**record) for record in records]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable search cache entry for {source}: {e}")
+            return None
+    
+    def put(self, source: str, query: str, limit: int, papers: List[ResearchPaper], fields: str = ""):
+        """Store parsed papers for a request"""
+        if not self._store or not papers:
+            return
+        try:
+            self._store.set(self.make_key(source, query, limit, fields), [asdict(p) for p in papers])
+        except Exception as e:
+            logger.warning(f"Could not write search cache entry for {source}: {e}")
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every caller of one API"""
+    
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = max(rate, 1e-6)  # Tokens added per second
+        self.capacity = max(1.0, burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a token is available; False if that would exceed timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return True
+                wait_time = (1.0 - self._tokens) / self.rate
+            if deadline is not None and now + wait_time > deadline:
+                return False
+            time.sleep(wait_time)
+    
+    def pause(self, seconds: float):
+        """Hold back every caller for the given time, e.g. after a Retry-After"""
+        with self._lock:
+            self._tokens = min(self._tokens, -seconds * self.rate)
+            self._updated = time.monotonic()
+
+class HttpSessionPool:
+    """Keep-alive sessions, retry adapters and rate limiters shared per API"""
+    
+    def __init__(self, config: Config):
+        self.config = config
+        self._sessions = {}
+        self._limiters = {}
+        self._arxiv_client = None
+        self._lock = threading.Lock()
+    
+    def session(self, api: str) -> "requests.Session":
+        """Return the pooled session for an API, creating it on first use"""
+        with self._lock:
+            if api not in self._sessions:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+                
+                retry = Retry(
+                    total=self.config.get("http.max_retries", 3),
+                    backoff_factor=self.config.get("http.backoff_factor", 1.0),
+                    status_forcelist=(500, 502, 503, 504),  # 429 is handled in get() so limiters see it
+                    allowed_methods=frozenset(["GET"]),
+                    respect_retry_after_header=False,
+                    raise_on_status=False
+                )
+                pool_size = self.config.get("http.pool_maxsize", 10)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["User-Agent"] = "ResearchArticleGenerator/1.0"
+                self._sessions[api] = session
+            return self._sessions[api]
+    
+    def limiter(self, api: str) -> TokenBucket:
+        """Return the token bucket shared by all callers of an API"""
+        with self._lock:
+            if api not in self._limiters:
+                limits = self.config.get(f"http.rate_limits.{api}", {}) or {}
+                self._limiters[api] = TokenBucket(limits.get("rate", 1.0), limits.get("burst", 1))
+            return self._limiters[api]
+    
+    def arxiv_client(self) -> "arxiv.Client":
+        """Return a shared arXiv client so its connection stays warm"""
+        with self._lock:
+            if self._arxiv_client is None:
+                import arxiv
+                self._arxiv_client = arxiv.Client(
+                    delay_seconds=0,  # Pacing is done by the shared token bucket
+                    num_retries=self.config.get("http.max_retries", 3)
+                )
+            return self._arxiv_client
+    
+    def get(self, api: str, url: str, timeout: float = 30, **kwargs) -> "requests.Response":
+        """Rate-limited GET that backs off on 429 and honours Retry-After"""
+        import requests
+        
+        limiter = self.limiter(api)
+        max_retries = self.config.get("http.max_retries", 3)
+        backoff = self.config.get("http.backoff_factor", 1.0)
+        
+        for attempt in range(max_retries + 1):
+            if not limiter.acquire(timeout=timeout):
+                raise requests.exceptions.RetryError(f"{api} rate limit wait exceeded {timeout}s")
+            
+            response = self.session(api).get(url, timeout=timeout, **kwargs)
+            if response.status_code != 429 or attempt == max_retries:
+                return response
+            
+            delay = self._retry_after(response) or backoff * (2 ** attempt)
+            logger.warning(f"{api} rate limited (429), pausing all callers for {delay:.1f}s")
+            limiter.pause(delay)
+        
+        return response
+    
+    @staticmethod
+    def _retry_after(response: "requests.Response") -> Optional[float]:
+        """Parse a Retry-After header given in seconds or as an HTTP date"""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            from email.utils import parsedate_to_datetime
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+class BM25Scorer:
+    """Batch BM25 relevance scoring with exact-phrase boosts over a candidate pool"""
+    
+    TOKEN_PATTERN = re.compile(r'\w+')
+    
+    def __init__(self, k1: float = 1.5, b: float = 0.75, title_weight: float = 2.0,
+                 abstract_weight: float = 0.5, title_phrase_boost: float = 5.0,
+                 abstract_phrase_boost: float = 2.0):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self.abstract_weight = abstract_weight
+        self.title_phrase_boost = title_phrase_boost
+        self.abstract_phrase_boost = abstract_phrase_boost
+    
+    def score(self, query: str, titles: List[str], abstracts: List[str]) -> "np.ndarray":
+        """Return one relevance score per candidate"""
+        import numpy as np
+        
+        query_lower = query.lower().strip()
+        query_terms = list(dict.fromkeys(self.TOKEN_PATTERN.findall(query_lower)))
+        scores = np.zeros(len(titles), dtype=np.float64)
+        if not len(titles) or not query_terms:
+            return scores
+        
+        for weight, texts in ((self.title_weight, titles), (self.abstract_weight, abstracts)):
+            tf, lengths = self._term_frequencies(texts, query_terms)
+            scores += weight * self._bm25(tf, lengths)
+        
+        # Exact phrase boosts, as in the original overlap scoring
+        if query_lower:
+            scores += self.title_phrase_boost * np.fromiter(
+                (bool(t) and query_lower in t.lower() for t in titles), dtype=bool, count=len(titles))
+            scores += self.abstract_phrase_boost * np.fromiter(
+                (bool(a) and query_lower in a.lower() for a in abstracts), dtype=bool, count=len(abstracts))
+        return scores
+    
+    def _term_frequencies(self, texts: List[str], query_terms: List[str]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Tokenize each text once into a (documents x query terms) count matrix"""
+        import numpy as np
+        
+        tf = np.zeros((len(texts), len(query_terms)), dtype=np.float64)
+        lengths = np.zeros(len(texts), dtype=np.float64)
+        for row, text in enumerate(texts):
+            if not text:
+                continue
+            tokens = self.TOKEN_PATTERN.findall(text.lower())
+            lengths[row] = len(tokens)
+            counts = Counter(tokens)
+            tf[row] = [counts.get(term, 0) for term in query_terms]
+        return tf, lengths
+    
+    def _bm25(self, tf: "np.ndarray", lengths: "np.ndarray") -> "np.ndarray":
+        """Vectorized BM25 over a term-frequency matrix"""
+        import numpy as np
+        
+        n_docs = tf.shape[0]
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+        avg_length = lengths.mean() or 1.0
+        norm = self.k1 * (1.0 - self.b + self.b * lengths / avg_length)
+        return (tf * (self.k1 + 1.0) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+class NearDuplicateIndex:
+    """Finds the same work across sources by DOI, arXiv ID or MinHash/LSH similarity"""
+    
+    TOKEN_PATTERN = re.compile(r'\w+')
+    SHINGLE_BASE = 0x100000001B3  # FNV-1a 64-bit prime
+    
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.5,
+                 shingle_size: int = 3, seed: int = 1):
+        import numpy as np
+        
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        # Multiply-shift hash family: (a * x + b) >> 32 with wrapping uint64 arithmetic, a odd
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(0, 1 << 63, size=(num_perm, 1), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size=(num_perm, 1), dtype=np.uint64)
+        self._exact = {}
+        self._buckets = {}
+        self._signatures = {}
+        self._token_hashes = {}
+    
+    def signature(self, paper: ResearchPaper) -> "np.ndarray":
+        """MinHash signature of the word shingles in title + abstract"""
+        import numpy as np
+        
+        tokens = self.TOKEN_PATTERN.findall(f"{paper.title} {paper.abstract}".lower()) or [""]
+        # Vocabulary repeats across papers, so each distinct token is hashed once
+        cache = self._token_hashes
+        for token in set(tokens).difference(cache):
+            cache[token] = zlib.crc32(token.encode("utf-8"))
+        token_hashes = np.fromiter(map(cache.__getitem__, tokens), dtype=np.uint64, count=len(tokens))
+        
+        # Rolling hash of every window of `shingle_size` consecutive tokens
+        size = min(self.shingle_size, len(tokens))
+        shingles = token_hashes[:len(tokens) - size + 1]
+        for offset in range(1, size):
+            shingles = shingles * np.uint64(self.SHINGLE_BASE) + token_hashes[offset:offset + len(shingles)]
+        shingles = np.unique(shingles)
+        return ((self._a * shingles + self._b) >> np.uint64(32)).min(axis=1).astype(np.uint32)
+    
+    @classmethod
+    def exact_keys(cls, paper: ResearchPaper) -> List[Tuple[str, str]]:
+        """Identifiers that mark two records as the same work outright"""
+        keys = []
+        if paper.doi:
+            keys.append(("doi", paper.doi.lower().strip()))
+        if paper.arxiv_id:
+            keys.append(("arxiv", paper.arxiv_id.lower().strip()))
+        title = " ".join(cls.TOKEN_PATTERN.findall(paper.title.lower()))
+        if title:
+            keys.append(("title", title))
+        return keys
+    
+    def _band_keys(self, signature: "np.ndarray") -> List[Tuple[int, bytes]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                for band in range(self.bands)]
+    
+    def add(self, paper: ResearchPaper, item_id: Any) -> Any:
+        """Index a paper and return the id of the cluster it joined (its own id if new)"""
+        exact_keys = self.exact_keys(paper)
+        signature = self.signature(paper)
+        band_keys = self._band_keys(signature)
+        
+        match = next((self._exact[key] for key in exact_keys if key in self._exact), None)
+        if match is None:
+            # Only papers sharing at least one LSH band are compared
+            best = self.threshold
+            candidates = {cid for key in band_keys for cid in self._buckets.get(key, ())}
+            for cid in candidates:
+                similarity = max(float((signature == other).mean()) for other in self._signatures[cid])
+                if similarity >= best:
+                    match, best = cid, similarity
+        
+        cluster = item_id if match is None else match
+        for key in exact_keys:
+            self._exact.setdefault(key, cluster)
+        for key in band_keys:
+            members = self._buckets.setdefault(key, [])
+            if cluster not in members:
+                members.append(cluster)
+        self._signatures.setdefault(cluster, []).append(signature)
+        return cluster
+    
+    @staticmethod
+    def merge(kept: ResearchPaper, other: ResearchPaper) -> ResearchPaper:
+        """Combine two records of the same work, keeping the richest metadata"""
+        def published_venue(venue):
+            return bool(venue) and venue.lower() != "arxiv"
+        
+        def rank(p):
+            return (bool(p.doi) or published_venue(p.venue), p.citations)
+        
+        # Prefer the published version; fill its gaps from the other record
+        primary, secondary = (other, kept) if rank(other) > rank(kept) else (kept, other)
+        venue = primary.venue
+        if not venue or (not published_venue(venue) and published_venue(secondary.venue)):
+            venue = secondary.venue
+        return replace(
+            primary,
+            authors=max(primary.authors, secondary.authors, key=len),
+            abstract=max(primary.abstract, secondary.abstract, key=len),
+            doi=primary.doi or secondary.doi,
+            arxiv_id=primary.arxiv_id or secondary.arxiv_id,
+            venue=venue,
+            citations=max(primary.citations, secondary.citations),
+            relevance_score=max(primary.relevance_score, secondary.relevance_score),
+            key_findings=primary.key_findings or secondary.key_findings
+        )
+
+class PaperCorpus:
+    """Local store of every fetched paper with an on-disk BM25 inverted index"""
+    
+    TOKEN_PATTERN = re.compile(r'\w+')
+    TITLE_WEIGHT = 2  # Title terms count twice, as in relevance scoring
+    
+    def __init__(self, config: Config):
+        self.mode = config.get("search.corpus.mode", "first")
+        self.directory = Path(config.get("search.corpus.path", "cache/corpus"))
+        self.reindex_after = config.get("search.corpus.reindex_after", 200)
+        self.min_term_coverage = config.get("search.corpus.min_term_coverage", 0.5)
+        self.k1 = config.get("search.bm25.k1", 1.5)
+        self.b = config.get("search.bm25.b", 0.75)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._segment = None  # Memory-mapped arrays of the current index generation
+        self._conn = sqlite3.connect(str(self.directory / "papers.sqlite"),
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS papers ("
+            "id INTEGER PRIMARY KEY, record TEXT NOT NULL, indexed INTEGER NOT NULL DEFAULT 0, added REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_papers_indexed ON papers (indexed);"
+            "CREATE TABLE IF NOT EXISTS paper_keys (key TEXT PRIMARY KEY, paper_id INTEGER NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, start INTEGER NOT NULL, count INTEGER NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);"
+        )
+    
+    def _term_counts(self, title: str, abstract: str) -> Counter:
+        counts = Counter(self.TOKEN_PATTERN.findall(abstract.lower()))
+        for term in self.TOKEN_PATTERN.findall(title.lower()):
+            counts[term] += self.TITLE_WEIGHT
+        return counts
+    
+    @staticmethod
+    def _dump(paper: ResearchPaper) -> str:
+        # Query-specific fields are not worth keeping
+        record = asdict(paper)
+        record["relevance_score"] = 0.0
+        record["key_findings"] = []
+        return json.dumps(record)
+    
+    def _generation(self) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'generation'").fetchone()
+        return int(row[0]) if row else 0
+    
+    def add_papers(self, papers: List[ResearchPaper]) -> int:
+        """Insert new papers, merge known ones, and reindex once enough have changed"""
+        added = 0
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for paper in papers:
+                    if not paper.title or not paper.abstract:
+                        continue
+                    keys = [f"{kind}:{value}" for kind, value in NearDuplicateIndex.exact_keys(paper)]
+                    paper_id = None
+                    for key in keys:
+                        row = self._conn.execute("SELECT paper_id FROM paper_keys WHERE key = ?", (key,)).fetchone()
+                        if row:
+                            paper_id = row[0]
+                            break
+                    
+                    if paper_id is None:
+                        paper_id = self._conn.execute(
+                            "INSERT INTO papers (record, added) VALUES (?, ?)", (self._dump(paper), now)
+                        ).lastrowid
+                        added += 1
+                    else:
+                        stored = self._conn.execute("SELECT record FROM papers WHERE id = ?", (paper_id,)).fetchone()[0]
+                        record = self._dump(NearDuplicateIndex.merge(ResearchPaper(**json.loads(stored)), paper))
+                        if record != stored:
+                            # Stale postings are masked until the next reindex
+                            self._conn.execute("UPDATE papers SET record = ?, indexed = 0 WHERE id = ?",
+                                               (record, paper_id))
+                    self._conn.executemany("INSERT OR IGNORE INTO paper_keys (key, paper_id) VALUES (?, ?)",
+                                           [(key, paper_id) for key in keys])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            
+            pending = self._conn.execute("SELECT COUNT(*) FROM papers WHERE indexed = 0").fetchone()[0]
+            if pending >= self.reindex_after:
+                self.rebuild_index()
+        return added
+    
+    def rebuild_index(self):
+        """Write a new generation of postings arrays and swap the lexicon to it"""
+        import numpy as np
+        from array import array
+        
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                generation = self._generation() + 1
+                vocabulary = {}
+                term_ids, rows, frequencies = array("i"), array("i"), array("f")
+                doc_ids, lengths = array("q"), array("f")
+                for row, (paper_id, record) in enumerate(self._conn.execute("SELECT id, record FROM papers ORDER BY id")):
+                    data = json.loads(record)
+                    counts = self._term_counts(data["title"], data["abstract"])
+                    doc_ids.append(paper_id)
+                    lengths.append(sum(counts.values()))
+                    for term, tf in counts.items():
+                        term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+                        rows.append(row)
+                        frequencies.append(tf)
+                
+                # Group postings by term; a stable sort keeps each list ordered by row
+                term_ids = np.frombuffer(term_ids, dtype=np.int32)
+                order = np.argsort(term_ids, kind="stable")
+                counts = np.bincount(term_ids, minlength=len(vocabulary))
+                starts = np.concatenate(([0], np.cumsum(counts)[:-1])) if len(vocabulary) else counts
+                arrays = {
+                    "rows": np.frombuffer(rows, dtype=np.int32)[order],
+                    "tf": np.frombuffer(frequencies, dtype=np.float32)[order],
+                    "doc_ids": np.frombuffer(doc_ids, dtype=np.int64),
+                    "lengths": np.frombuffer(lengths, dtype=np.float32)
+                }
+                for name, values in arrays.items():
+                    np.save(self.directory / f"{name}_{generation}.npy", values)
+                
+                self._conn.execute("DELETE FROM terms")
+                self._conn.executemany(
+                    "INSERT INTO terms (term, start, count) VALUES (?, ?, ?)",
+                    ((term, int(starts[i]), int(counts[i])) for term, i in vocabulary.items())
+                )
+                self._conn.execute("UPDATE papers SET indexed = 1 WHERE indexed = 0")
+                self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('generation', ?)",
+                                   (str(generation),))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            
+            self._segment = None
+            for path in self.directory.glob("*.npy"):
+                if not path.stem.endswith(f"_{generation}"):
+                    path.unlink(missing_ok=True)
+            logger.info(f"Corpus reindexed: {len(doc_ids)} papers, {len(vocabulary)} terms")
+    
+    def _load_segment(self, generation: int) -> Optional[Dict[str, Any]]:
+        import numpy as np
+        
+        if generation == 0:
+            return None
+        if self._segment is None or self._segment["generation"] != generation:
+            segment = {"generation": generation}
+            for name in ("rows", "tf", "doc_ids", "lengths"):
+                segment[name] = np.load(self.directory / f"{name}_{generation}.npy", mmap_mode="r")
+            self._segment = segment
+        return self._segment
+    
+    def search(self, query: str, limit: int = 50) -> List[ResearchPaper]:
+        """Return the best-matching local papers that cover enough of the query"""
+        import numpy as np
+        
+        terms = list(dict.fromkeys(self.TOKEN_PATTERN.findall(query.lower())))
+        if not terms:
+            return []
+        
+        with self._lock:
+            # Read the lexicon and unindexed papers from one snapshot
+            self._conn.execute("BEGIN")
+            try:
+                generation = self._generation()
+                placeholders = ",".join("?" * len(terms))
+                lexicon = {term: (start, count) for term, start, count in self._conn.execute(
+                    f"SELECT term, start, count FROM terms WHERE term IN ({placeholders})", terms)}
+                delta = self._conn.execute("SELECT id, record FROM papers WHERE indexed = 0").fetchall()
+            finally:
+                self._conn.execute("COMMIT")
+            segment = self._load_segment(generation)
+        
+        delta_ids = np.array([paper_id for paper_id, _ in delta], dtype=np.int64)
+        delta_records = [json.loads(record) for _, record in delta]
+        delta_counts = [self._term_counts(r["title"], r["abstract"]) for r in delta_records]
+        delta_lengths = np.array([sum(c.values()) for c in delta_counts], dtype=np.float64)
+        
+        base_size = len(segment["doc_ids"]) if segment else 0
+        n_docs = base_size + len(delta)
+        if not n_docs:
+            return []
+        total_length = (float(segment["lengths"].sum()) if segment else 0.0) + float(delta_lengths.sum())
+        avg_length = total_length / n_docs or 1.0
+        
+        base_scores = np.zeros(base_size)
+        base_coverage = np.zeros(base_size)
+        delta_scores = np.zeros(len(delta))
+        delta_coverage = np.zeros(len(delta))
+        total_idf = 0.0
+        for term in terms:
+            start, count = lexicon.get(term, (0, 0))
+            delta_tf = np.array([c.get(term, 0) for c in delta_counts], dtype=np.float64)
+            df = count + int(np.count_nonzero(delta_tf))
+            idf = float(np.log1p((n_docs - df + 0.5) / (df + 0.5)))
+            total_idf += idf
+            if count:
+                rows = segment["rows"][start:start + count]
+                tf = segment["tf"][start:start + count].astype(np.float64)
+                norm = self.k1 * (1.0 - self.b + self.b * segment["lengths"][rows] / avg_length)
+                base_scores[rows] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+                base_coverage[rows] += idf
+            if len(delta):
+                norm = self.k1 * (1.0 - self.b + self.b * delta_lengths / avg_length)
+                delta_scores += idf * delta_tf * (self.k1 + 1.0) / (delta_tf + norm)
+                delta_coverage += idf * (delta_tf > 0)
+        
+        # Only papers matching enough of the query's weight count as answers
+        required = self.min_term_coverage * total_idf
+        base_ok = base_coverage >= required
+        if base_size and len(delta):
+            base_ok &= ~np.isin(segment["doc_ids"], delta_ids)  # Superseded by a newer record
+        candidates = [(float(base_scores[row]), "base", int(row)) for row in np.flatnonzero(base_ok)]
+        candidates += [(float(delta_scores[i]), "delta", i) for i in np.flatnonzero(delta_coverage >= required)]
+        best = heapq.nlargest(limit, candidates)
+        
+        base_ids = [int(segment["doc_ids"][row]) for _, kind, row in best if kind == "base"]
+        records = {}
+        for chunk in range(0, len(base_ids), 500):
+            ids = base_ids[chunk:chunk + 500]
+            with self._lock:
+                records.update(self._conn.execute(
+                    f"SELECT id, record FROM papers WHERE id IN ({','.join('?' * len(ids))})", ids).fetchall())
+        
+        papers = []
+        for _, kind, row in best:
+            if kind == "delta":
+                papers.append(ResearchPaper(**delta_records[row]))
+            elif int(segment["doc_ids"][row]) in records:
+                papers.append(ResearchPaper(**json.loads(records[int(segment["doc_ids"][row])])))
+        return papers
+    
+    def stats(self) -> Dict[str, Any]:
+        """Summarize the corpus size and index state"""
+        with self._lock:
+            papers, pending = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(indexed = 0), 0) FROM papers").fetchone()
+            generation = self._generation()
+        return {"papers": papers, "unindexed": pending, "generation": generation}
+
 class PaperSearcher:
     """Enhanced paper searcher with better filtering and error handling"""
     
-    def __init__(self, config: Config):
+    SEMANTIC_SCHOLAR_FIELDS = "title,authors,year,abstract,url,citationCount,venue,externalIds,fieldsOfStudy"
+    
+    def __init__(self, config: Config, cache: Optional[SearchCache] = None,
+                 http: Optional[HttpSessionPool] = None, corpus: Optional[PaperCorpus] = None):
         self.config = config
+        self.cache = cache if cache is not None else SearchCache(config)
+        self.http = http if http is not None else HttpSessionPool(config)
+        if corpus is None and config.get("search.corpus.mode", "first") != "off":
+            try:
+                corpus = PaperCorpus(config)
+            except Exception as e:
+                logger.warning(f"Local corpus unavailable, searching remote sources only: {e}")
+        self.corpus = corpus
+        self.tracer = Tracer(enabled=False)
+        self.relevance_scorer = BM25Scorer(
+            k1=config.get("search.bm25.k1", 1.5),
+            b=config.get("search.bm25.b", 0.75)
+        )
         self.papers = []
         self.search_stats = {
             "total_found": 0,
             "after_deduplication": 0,
             "after_filtering": 0,
-            "by_source": {}
+            "by_source": {},
+            "source_seconds": {},
+            "timed_out": [],
+            "cache": {"hits": 0, "misses": 0}
         }
+        self._stats_lock = threading.Lock()
     
     def search_semantic_scholar(self, query: str, limit: int = 15) -> List[ResearchPaper]:
         """Enhanced Semantic Scholar search with better error handling"""
+        import requests
+        
         papers = []
         try:
             base_url = "https://api.semanticscholar.org/graph/v1/paper/search"
             params = {
                 "query": query,
                 "limit": limit,
-                "fields": "title,authors,year,abstract,url,citationCount,venue,externalIds,fieldsOfStudy"
+                "fields": self.SEMANTIC_SCHOLAR_FIELDS
             }
             
-            headers = {"User-Agent": "ResearchArticleGenerator/1.0"}
+            headers = {}
             api_key = self.config.get("apis.semantic_scholar_api_key")
             if api_key:
                 headers["x-api-key"] = api_key
             
-            response = requests.get(base_url, params=params, headers=headers, timeout=30)
+            timeout = self.config.get("search.source_timeouts.semantic_scholar",
+                                      self.config.get("search.source_timeout", 45))
+            response = self.http.get("semantic_scholar", base_url, params=params, headers=headers, timeout=timeout)
             response.raise_for_status()
             
             data = response.json()
@@ -385,17 +1295,15 @@ class PaperSearcher:
                         paper = ResearchPaper(
                             title=paper_data.get("title", "").strip(),
                             authors=[author.get("name", "") for author in paper_data.get("authors", [])],
-                            year=paper_data.get("year") or datetime.now().year,
+                            year=paper_data.get("year") or current_year(),
                             abstract=abstract,
                             url=paper_data.get("url", ""),
                             venue=paper_data.get("venue", ""),
                             citations=paper_data.get("citationCount", 0),
-                            doi=paper_data.get("externalIds", {}).get("DOI", ""),
+                            doi=(paper_data.get("externalIds") or {}).get("DOI", ""),
+                            arxiv_id=(paper_data.get("externalIds") or {}).get("ArXiv", ""),
                             source="Semantic Scholar"
                         )
-                        
-                        # Calculate relevance score
-                        paper.relevance_score = self._calculate_relevance(paper, query)
                         papers.append(paper)
                 except Exception as e:
                     import sys
@@ -418,6 +1326,8 @@ class PaperSearcher:
     
     def search_google_scholar(self, query: str, limit: int = 10) -> List[ResearchPaper]:
         """Enhanced Google Scholar search with better error handling"""
+        from scholarly import scholarly
+        
         papers = []
         try:
             search_query = scholarly.search_pubs(query)
@@ -439,9 +1349,9 @@ class PaperSearcher:
                     if abstract and len(abstract.split()) >= 20:  # More lenient requirement
                         year = filled_result.get("bib", {}).get("pub_year")
                         if isinstance(year, str):
-                            year = int(year) if year.isdigit() else datetime.now().year
+                            year = int(year) if year.isdigit() else current_year()
                         elif not year:
-                            year = datetime.now().year
+                            year = current_year()
                         
                         paper = ResearchPaper(
                             title=filled_result.get("bib", {}).get("title", "").strip(),
@@ -453,8 +1363,6 @@ class PaperSearcher:
                             citations=filled_result.get("num_citations", 0),
                             source="Google Scholar"
                         )
-                        
-                        paper.relevance_score = self._calculate_relevance(paper, query)
                         papers.append(paper)
                         count += 1
                 
@@ -477,15 +1385,22 @@ class PaperSearcher:
     
     def search_arxiv(self, query: str, limit: int = 15) -> List[ResearchPaper]:
         """Enhanced arXiv search"""
+        import arxiv
+        
         papers = []
         try:
-            client = arxiv.Client()
+            client = self.http.arxiv_client()
             search = arxiv.Search(
                 query=query,
                 max_results=limit,
                 sort_by=arxiv.SortCriterion.Relevance
             )
             
+            timeout = self.config.get("search.source_timeouts.arxiv", self.config.get("search.source_timeout", 45))
+            if not self.http.limiter("arxiv").acquire(timeout=timeout):
+                logger.warning("arXiv rate limit wait exceeded the source deadline")
+                return papers
+            
             for result in client.results(search):
                 paper = ResearchPaper(
                     title=result.title.strip(),
@@ -495,10 +1410,9 @@ class PaperSearcher:
                     url=result.pdf_url,
                     doi=result.doi or "",
                     venue="arXiv",
-                    source="arXiv"
+                    source="arXiv",
+                    arxiv_id=re.sub(r'v\d+$', '', result.get_short_id())
                 )
-                
-                paper.relevance_score = self._calculate_relevance(paper, query)
                 papers.append(paper)
             
             logger.info(f"arXiv: Found {len(papers)} papers")
@@ -510,85 +1424,174 @@ class PaperSearcher:
         
         return papers
     
-    def _calculate_relevance(self, paper: ResearchPaper, query: str) -> float:
-        """Calculate relevance score for a paper based on query"""
-        score = 0.0
-        query_terms = set(query.lower().split())
-        
-        # Title relevance
-        title_terms = set(paper.title.lower().split()) if paper.title else set()
-        title_overlap = len(query_terms.intersection(title_terms))
-        score += title_overlap * 2.0
-        
-        # Abstract relevance
-        if paper.abstract:
-            abstract_terms = set(paper.abstract.lower().split())
-            abstract_overlap = len(query_terms.intersection(abstract_terms))
-            score += abstract_overlap * 0.5
-        
-        # Boost for exact phrase matches
-        query_lower = query.lower()
-        if paper.title and query_lower in paper.title.lower():
-            score += 5.0
-        if paper.abstract and query_lower in paper.abstract.lower():
-            score += 2.0
-        
-        return score
+    def _score_relevance(self, papers: List[ResearchPaper], query: str):
+        """Score a whole candidate pool against the query in one batch"""
+        if not papers:
+            return
+        scores = self.relevance_scorer.score(query, [p.title for p in papers], [p.abstract for p in papers])
+        for paper, score in zip(papers, scores.tolist()):
+            paper.relevance_score = score
+    
+    def _search_source(self, source: str, query: str, limit: int) -> List[ResearchPaper]:
+        """Dispatch a query to a single configured source, consulting the cache first"""
+        with self.tracer.span(f"search.{source}", query=query, limit=limit) as span:
+            fields = self.SEMANTIC_SCHOLAR_FIELDS if source == "semantic_scholar" else ""
+            cached = self.cache.get(source, query, limit, fields)
+            with self._stats_lock:
+                self.search_stats["cache"]["hits" if cached is not None else "misses"] += 1
+            span["cache_hit"] = cached is not None
+            if cached is not None:
+                logger.info(f"{source}: {len(cached)} papers served from cache")
+                span["papers"] = len(cached)
+                return cached
+            
+            papers = self._fetch_source(source, query, limit)
+            self.cache.put(source, query, limit, papers, fields)
+            span["papers"] = len(papers)
+            return papers
     
-    def search_all_sources(self, query: str) -> List[ResearchPaper]:
-        """Enhanced search with better source management and fallbacks"""
+    def _fetch_source(self, source: str, query: str, limit: int) -> List[ResearchPaper]:
+        """Query a single source over the network"""
+        if source == "semantic_scholar":
+            return self.search_semantic_scholar(query, limit)
+        elif source == "google_scholar":
+            return []  # Giving captcha error
+            # return self.search_google_scholar(query, limit)
+        elif source == "arxiv":
+            return self.search_arxiv(query, limit)
+        
+        logger.warning(f"Unknown search source: {source}")
+        return []
+    
+    def _search_sources_concurrently(self, query: str, sources: List[str], limit: int,
+                                     deadline: float) -> Tuple[List[ResearchPaper], Dict[str, int]]:
+        """Fan a query out to every source at once and merge results as they arrive"""
         all_papers = []
-        sources = self.config.get("search.search_sources", ["semantic_scholar", "arxiv"])
-        max_per_source = self.config.get("search.max_results_per_source", 15)
+        counts = {}
+        default_timeout = self.config.get("search.source_timeout", 45)
+        start = time.monotonic()
         
-        logger.info(f"Searching for papers on: '{query}'")
-        logger.info(f"Using sources: {sources}")
-        
-        # Search each source
+        executor = ThreadPoolExecutor(max_workers=max(1, len(sources)), thread_name_prefix="search")
+        pending = {}
+        source_deadlines = {}
         for source in sources:
-            try:
-                papers = []
-                if source == "semantic_scholar":
-                    papers = self.search_semantic_scholar(query, max_per_source)
-                elif source == "google_scholar":
-                    pass #Giving captcha error
-                    # papers = self.search_google_scholar(query, max_per_source)
-                elif source == "arxiv":
-                    papers = self.search_arxiv(query, max_per_source)
+            future = executor.submit(self._search_source, source, query, limit)
+            pending[future] = source
+            source_timeout = self.config.get(f"search.source_timeouts.{source}", default_timeout)
+            source_deadlines[future] = min(deadline, start + source_timeout)
+        
+        try:
+            while pending:
+                next_deadline = min(source_deadlines[f] for f in pending)
+                done, _ = wait(pending, timeout=max(0.0, next_deadline - time.monotonic()),
+                               return_when=FIRST_COMPLETED)
                 
-                all_papers.extend(papers)
-                self.search_stats["by_source"][source] = len(papers)
+                # Merge whatever has arrived
+                for future in done:
+                    source = pending.pop(future)
+                    try:
+                        papers = future.result()
+                    except Exception as e:
+                        logger.error(f"Error searching {source}: {e}")
+                        papers = []
+                    all_papers.extend(papers)
+                    counts[source] = len(papers)
+                    self.search_stats["source_seconds"][source] = round(time.monotonic() - start, 2)
+                    logger.info(f"{source}: {len(papers)} papers arrived after "
+                                f"{time.monotonic() - start:.1f}s")
                 
+                # Abandon sources that are past their deadline
+                now = time.monotonic()
+                for future in [f for f in pending if now >= source_deadlines[f]]:
+                    source = pending.pop(future)
+                    future.cancel()
+                    counts[source] = 0
+                    self.search_stats["timed_out"].append(source)
+                    logger.warning(f"{source} did not respond within its deadline, continuing without it")
+        finally:
+            # Never block on a stalled source; its thread finishes in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return all_papers, counts
+    
+    def _search_corpus(self, query: str) -> List[ResearchPaper]:
+        """Answer a query from the local corpus"""
+        with self.tracer.span("search.corpus", query=query) as span:
+            try:
+                papers = self.corpus.search(query, limit=self.config.get("search.corpus.max_local_results", 60))
             except Exception as e:
-                import sys
-                lineno = sys.exc_info()[2].tb_lineno
-                logger.error(f"Error searching {source} at line {lineno}: {e}")
-                continue
+                logger.warning(f"Local corpus search failed: {e}")
+                papers = []
+            span["papers"] = len(papers)
+        logger.info(f"corpus: {len(papers)} local papers match")
+        return papers
+    
+    def _search_remote(self, query: str, sources: List[str], limit: int,
+                       deadline: float) -> Tuple[List[ResearchPaper], Dict[str, int]]:
+        """Search remote sources and keep everything they return in the local corpus"""
+        papers, counts = self._search_sources_concurrently(query, sources, limit, deadline)
+        if self.corpus is not None and papers:
+            with self.tracer.span("search.corpus_add", papers=len(papers)) as span:
+                try:
+                    span["added"] = self.corpus.add_papers(papers)
+                except Exception as e:
+                    logger.warning(f"Could not add papers to the local corpus: {e}")
+        return papers, counts
+    
+    def search_all_sources(self, query: str, corpus_query: Optional[str] = None) -> List[ResearchPaper]:
+        """Enhanced search with concurrent source fan-out and fallbacks
+        
+        corpus_query, when given, is what the local corpus is asked instead of query. The corpus
+        only returns papers covering enough query terms, so generic terms added for remote search
+        would hide local matches.
+        """
+        corpus_query = corpus_query or query
+        sources = self.config.get("search.search_sources", ["semantic_scholar", "arxiv"])
+        max_per_source = self.config.get("search.max_results_per_source", 15)
+        deadline = time.monotonic() + self.config.get("search.total_timeout", 90)
+        
+        mode = self.config.get("search.corpus.mode", "first") if self.corpus is not None else "off"
+        min_local = self.config.get("search.corpus.min_local_results", 30)
+        
+        logger.info(f"Searching for papers on: '{query}'")
+        logger.info(f"Using sources: {sources} (local corpus: {mode})")
+        
+        # Local papers first; remote sources only top up when there are too few
+        all_papers = self._search_corpus(corpus_query) if mode != "off" else []
+        if mode != "off":
+            self.search_stats["by_source"]["corpus"] = len(all_papers)
+        if mode == "off" or (mode == "first" and len(all_papers) < min_local):
+            # Search every source at once
+            remote_papers, counts = self._search_remote(query, sources, max_per_source, deadline)
+            self.search_stats["by_source"].update(counts)
+            all_papers.extend(remote_papers)
         
         self.search_stats["total_found"] = len(all_papers)
         logger.info(f"Total papers found across all sources: {len(all_papers)}")
         
-        if not all_papers:
+        if not all_papers and time.monotonic() < deadline:
             logger.warning("No papers found from any source!")
             # Try a broader search with modified query
             broader_query = " ".join(query.split()[:3])  # Use fewer terms
             logger.info(f"Trying broader search with: '{broader_query}'")
             
-            for source in sources:
-                try:
-                    if source == "semantic_scholar":
-                        papers = self.search_semantic_scholar(broader_query, max_per_source * 2)
-                    elif source == "arxiv":
-                        papers = self.search_arxiv(broader_query, max_per_source * 2)
-                    all_papers.extend(papers)
-                except Exception as e:
-                    import sys
-                    lineno = sys.exc_info()[2].tb_lineno
-                    logger.error(f"Broader search failed for {source} at line {lineno}: {e}")
+            if mode != "off":
+                local_papers = self._search_corpus(" ".join(corpus_query.split()[:3]))
+                self.search_stats["by_source"]["corpus"] += len(local_papers)
+                all_papers.extend(local_papers)
+            if mode != "offline":
+                broader_papers, counts = self._search_remote(broader_query, sources, max_per_source * 2, deadline)
+                for source, count in counts.items():
+                    self.search_stats["by_source"][source] = self.search_stats["by_source"].get(source, 0) + count
+                all_papers.extend(broader_papers)
+            self.search_stats["total_found"] = len(all_papers)
+        
+        with self.tracer.span("search.relevance", candidates=len(all_papers)):
+            self._score_relevance(all_papers, query)
         
         # Filter and deduplicate with improved logic
-        filtered_papers = self._filter_and_deduplicate(all_papers)
-        self.search_stats["after_deduplication"] = len(set(p.title.lower() for p in all_papers if p.title))
+        with self.tracer.span("search.filter_dedup", candidates=len(all_papers)):
+            filtered_papers = self._filter_and_deduplicate(all_papers)
         self.search_stats["after_filtering"] = len(filtered_papers)
         
         logger.info(f"Papers after filtering and deduplication: {len(filtered_papers)}")
@@ -596,72 +1599,67 @@ class PaperSearcher:
         return filtered_papers
     
     def _filter_and_deduplicate(self, papers: List[ResearchPaper]) -> List[ResearchPaper]:
-        """Improved filtering with more lenient criteria and better fallbacks"""
+        """Merge near-duplicates, then evaluate strict and lenient tiers together over columns"""
         if not papers:
+            self.search_stats["after_deduplication"] = 0
             return []
         
-        seen_titles = set()
-        filtered_papers = []
-        current_year = datetime.now().year
+        import numpy as np
         
         # Configuration
         min_citations = self.config.get("search.min_citation_count", 0)
         max_age = self.config.get("search.max_year_range", 15)
         quality_threshold = self.config.get("search.quality_threshold", 2.0)
+        max_papers = self.config.get("search.max_papers", 25)
         
         logger.info(f"Filtering criteria:")
         logger.info(f"  - Min citations: {min_citations}")
         logger.info(f"  - Max age: {max_age} years")
         logger.info(f"  - Quality threshold: {quality_threshold}")
         
-        # First pass: strict filtering
-        for paper in papers:
-            # Skip if no title or abstract
+        # Cluster records of the same work across sources and merge each cluster
+        index = NearDuplicateIndex(
+            num_perm=self.config.get("search.dedup.num_perm", 64),
+            bands=self.config.get("search.dedup.bands", 16),
+            threshold=self.config.get("search.dedup.threshold", 0.5)
+        )
+        unique = {}
+        merged = 0
+        for order, paper in enumerate(papers):
             if not paper.title or not paper.abstract:
                 continue
-            
-            # Normalize title for comparison
-            title_normalized = re.sub(r'[^\w\s]', '', paper.title.lower().strip())
-            if title_normalized in seen_titles:
-                continue
-            seen_titles.add(title_normalized)
-            
-            # Apply filters
-            age = current_year - paper.year
-            if (paper.citations >= min_citations and 
-                age <= max_age and
-                paper.quality_score >= quality_threshold):
-                filtered_papers.append(paper)
-        
-        logger.info(f"After strict filtering: {len(filtered_papers)} papers")
-        
-        # If we have too few papers, use more lenient criteria
-        if len(filtered_papers) < 10:
+            cluster = index.add(paper, order)
+            if cluster in unique:
+                unique[cluster] = index.merge(unique[cluster], paper)
+                merged += 1
+            else:
+                unique[cluster] = paper
+        self.search_stats["near_duplicates_merged"] = merged
+        
+        # Evaluate both tiers at once over columns instead of paper objects
+        candidates = list(unique.values())
+        columns = PaperColumns(candidates)
+        age = current_year() - columns.years
+        strict = ((columns.citations >= min_citations) &
+                  (age <= max_age) &
+                  (columns.quality >= quality_threshold))
+        # More lenient criteria: older papers, shorter abstracts, lower quality threshold
+        lenient = (age <= 20) & (columns.quality >= 1.0) & (columns.abstract_words >= 20)
+        strict_count = int(np.count_nonzero(strict))
+        
+        logger.info(f"After strict filtering: {strict_count} papers")
+        self.search_stats["after_deduplication"] = len(unique)
+        self.search_stats["strict_matches"] = strict_count
+        
+        if strict_count >= 10:
+            final_scores = columns.quality + columns.relevance + columns.citations / 100
+            chosen = self._top_indices(strict, final_scores, max_papers)
+        else:
+            # If we have too few papers, use the lenient tier instead
             logger.info("Too few papers, applying lenient filtering...")
-            filtered_papers = []
-            seen_titles = set()
-            
-            # Sort by quality and relevance
-            papers_sorted = sorted(papers, key=lambda p: (p.quality_score + p.relevance_score), reverse=True)
-            
-            for paper in papers_sorted:
-                if len(filtered_papers) >= 20:  # Stop at reasonable number
-                    break
-                
-                if not paper.title or not paper.abstract:
-                    continue
-                
-                title_normalized = re.sub(r'[^\w\s]', '', paper.title.lower().strip())
-                if title_normalized in seen_titles:
-                    continue
-                seen_titles.add(title_normalized)
-                
-                # More lenient criteria
-                age = current_year - paper.year
-                if (age <= 20 and  # Allow older papers
-                    len(paper.abstract.split()) >= 20 and  # Minimum abstract length
-                    paper.quality_score >= 1.0):  # Lower quality threshold
-                    filtered_papers.append(paper)
+            chosen = self._top_indices(lenient, columns.quality + columns.relevance, 20)
+        filtered_papers = [candidates[i] for i in chosen]
+        self.search_stats["lenient_filtering"] = strict_count < 10
         
         logger.info(f"Final filtered count: {len(filtered_papers)}")
         
@@ -669,61 +1667,555 @@ class PaperSearcher:
         filtered_papers.sort(key=lambda p: (p.quality_score + p.relevance_score + (p.citations/100)), reverse=True)
         
         # Limit to maximum papers
-        max_papers = self.config.get("search.max_papers", 25)
         return filtered_papers[:max_papers]
+    
+    @staticmethod
+    def _top_indices(mask: "np.ndarray", scores: "np.ndarray", size: int) -> List[int]:
+        """Indices of the `size` best-scoring rows in `mask`, earlier rows winning ties"""
+        import numpy as np
+        
+        rows = np.flatnonzero(mask)
+        if size <= 0 or not len(rows):
+            return []
+        values = scores[rows]
+        if len(rows) > size:
+            # Bounded selection: partition around the size-th best score and only order the survivors
+            cutoff = np.partition(values, len(values) - size)[len(values) - size]
+            above = np.flatnonzero(values > cutoff)
+            ties = np.flatnonzero(values == cutoff)[:size - len(above)]
+            keep = np.sort(np.concatenate((above, ties)))
+            rows, values = rows[keep], values[keep]
+        order = np.argsort(-values, kind="stable")
+        return rows[order].tolist()
 
-class ContentExtractor:
-    """Enhanced content extraction with better insight generation"""
+class SentenceSegmenter:
+    """Splits text into sentences; subclasses register under a config name"""
+    
+    name = ""
+    
+    def split(self, text: str) -> List[str]:
+        raise NotImplementedError
+    
+    @staticmethod
+    def create(name: str) -> "SentenceSegmenter":
+        """Build the segmenter configured as content.segmenter"""
+        segmenters = {"rules": RuleBasedSegmenter, "punkt": PunktSegmenter}
+        if name not in segmenters:
+            logger.warning(f"Unknown sentence segmenter '{name}', using rules")
+            name = "rules"
+        return segmenters[name]()
+
+class RuleBasedSegmenter(SentenceSegmenter):
+    """Precompiled sentence splitter tuned for scientific abstracts"""
+    
+    name = "rules"
+    
+    # Sentence-final punctuation, optional closing quotes or brackets, then whitespace
+    BOUNDARY = re.compile(r'[.!?]+["\')\]]*\s+')
+    # Word before the punctuation, ignoring opening brackets and quotes
+    PREVIOUS_WORD = re.compile(r'[(\["\']*([\w.]+)[.!?]*["\')\]]*$')
+    # Word after the boundary, skipping opening brackets and quotes
+    NEXT_WORD = re.compile(r'["\'(\[]*([\w-]*)')
+    # Never end a sentence
+    ABBREVIATIONS = {
+        "e.g", "i.e", "vs", "cf", "viz", "approx", "ca", "resp",
+        "fig", "figs", "eq", "eqs", "ref", "refs", "nos", "vol", "pp",
+        "dr", "prof", "mr", "mrs", "ms", "jr", "univ", "dept", "eds"
+    }
+    # Also ordinary words; only continue the sentence before lowercase text or a number ("et al. (2019)", "No. 5")
+    AMBIGUOUS_ABBREVIATIONS = {
+        "al", "no", "st", "sr", "co", "inc", "ltd", "ed", "sec", "ch", "tab",
+        "min", "max", "avg", "std", "est"
+    }
+    # Capitalized words that open sentences far more often than they follow an initial ("A" is left out: "J. A. Smith")
+    SENTENCE_STARTERS = {
+        "an", "the", "this", "these", "that", "those", "it", "its", "we", "our", "they", "their",
+        "in", "on", "at", "for", "from", "by", "with", "to", "as", "using", "here", "there", "such",
+        "however", "moreover", "furthermore", "thus", "therefore", "hence", "overall", "finally",
+        "next", "then", "first", "second", "third", "both", "each", "all", "although", "while",
+        "when", "after", "results"
+    }
+    
+    def split(self, text: str) -> List[str]:
+        sentences = []
+        start = 0
+        for match in self.BOUNDARY.finditer(text):
+            end = match.end()
+            if end >= len(text):
+                break
+            # Abstract sentences start with a capital, digit, bracket or quote, never lowercase
+            if text[end].islower():
+                continue
+            if match.group().startswith(".") and not self._ends_sentence(text[start:match.start() + 1], text[end:]):
+                continue
+            sentence = text[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = end
+        tail = text[start:].strip()
+        if tail:
+            sentences.append(tail)
+        return sentences
+    
+    def _ends_sentence(self, fragment: str, following: str) -> bool:
+        """Whether the period closing this fragment ends a sentence, given the text after it"""
+        word = self.PREVIOUS_WORD.search(fragment)
+        if not word:
+            return True
+        token = word.group(1).rstrip(".")
+        next_word = self.NEXT_WORD.match(following).group(1)
+        if token.lower() in self.ABBREVIATIONS:
+            return False
+        if token.lower() in self.AMBIGUOUS_ABBREVIATIONS:
+            return not next_word or not (next_word[0].islower() or next_word[0].isdigit())
+        # Initials such as "J. Smith" or "U.S.", unless a common sentence opener follows
+        if ((len(token) == 1 and token.isalpha() and token.isupper()) or
+                ("." in token and all(len(part) == 1 for part in token.split(".")))):
+            return next_word.lower() in self.SENTENCE_STARTERS
+        return True
+
+class PunktSegmenter(SentenceSegmenter):
+    """NLTK punkt tokenizer, loaded (and downloaded if missing) only when selected"""
+    
+    name = "punkt"
     
     def __init__(self):
-        # Download required NLTK data
+        self._tokenize = None
+        self._lock = threading.Lock()
+    
+    def split(self, text: str) -> List[str]:
+        if self._tokenize is None:
+            with self._lock:
+                if self._tokenize is None:
+                    import nltk
+                    # Newer NLTK releases ship the model as punkt_tab
+                    for resource in ('punkt_tab', 'punkt'):
+                        try:
+                            nltk.data.find(f'tokenizers/{resource}')
+                        except LookupError:
+                            nltk.download(resource, quiet=True)
+                    from nltk.tokenize import sent_tokenize
+                    self._tokenize = sent_tokenize
+        return self._tokenize(text)
+
+class KeywordMatcher:
+    """Counts many keywords in one scan per text using a trie-compiled regex"""
+    
+    def __init__(self, keywords: List[str]):
+        self.keywords = list(dict.fromkeys(k.lower() for k in keywords if k))
+        trie = {}
+        for keyword in self.keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = True
+        
+        # A match also credits every keyword that is a prefix of it, since both start there
+        self._credits = {}
+        for keyword in self.keywords:
+            node, credited = trie, []
+            for i, char in enumerate(keyword, 1):
+                node = node[char]
+                if "" in node:
+                    credited.append(keyword[:i])
+            self._credits[keyword] = credited
+        
+        # The lookahead makes matches zero-width so overlapping keywords are all found
+        self._pattern = re.compile(f"(?=({self._trie_regex(trie)}))") if self.keywords else None
+    
+    @classmethod
+    def _trie_regex(cls, node: Dict[str, Any]) -> str:
+        """Longest-match-first regex for a trie node"""
+        branches = [re.escape(char) + cls._trie_regex(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+    
+    def count(self, text: str) -> Dict[str, int]:
+        """Non-overlapping occurrences of each keyword, like str.count, in one scan"""
+        counts = {}
+        if not self._pattern or not text:
+            return counts
+        next_start = {}
+        for match in self._pattern.finditer(text.lower()):
+            start = match.start()
+            for keyword in self._credits[match.group(1)]:
+                if start >= next_start.get(keyword, 0):
+                    counts[keyword] = counts.get(keyword, 0) + 1
+                    next_start[keyword] = start + len(keyword)
+        return counts
+
+class FindingsCache:
+    """Persistent key findings per abstract, keyed by a hash of its text"""
+    
+    VERSION = 1  # Bump when the extraction rules change
+    
+    def __init__(self, config: Config):
+        self.enabled = config.get("cache.findings.enabled", True)
+        self._store = None
+        if self.enabled:
+            try:
+                self._store = DiskCache(
+                    config.get("cache.findings.path", "cache/findings_cache.sqlite"),
+                    max_bytes=int(config.get("cache.findings.max_mb", 32) * 1024 * 1024)
+                )
+            except Exception as e:
+                logger.warning(f"Findings cache unavailable, continuing without it: {e}")
+                self.enabled = False
+    
+    @classmethod
+    def make_key(cls, abstract: str, segmenter: str = "") -> str:
+        return hashlib.sha256(f"{cls.VERSION}\0{segmenter}\0{abstract}".encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[List[str]]:
+        """Return cached findings, or None on a miss"""
+        if not self._store:
+            return None
         try:
-            nltk.data.find('tokenizers/punkt')
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            nltk.download('punkt', quiet=True)
-            nltk.download('stopwords', quiet=True)
+            return self._store.get(key)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable findings cache entry: {e}")
+            return None
+    
+    def put(self, key: str, findings: List[str]):
+        if not self._store:
+            return
+        try:
+            self._store.set(key, findings)
+        except Exception as e:
+            logger.warning(f"Could not write findings cache entry: {e}")
+
+_worker_extractors = {}
+
+def _extract_findings_worker(abstracts: List[str], segmenter: str = "rules") -> List[List[str]]:
+    """Process-pool entry point: extract findings for a chunk of abstracts"""
+    extractor = _worker_extractors.get(segmenter)
+    if extractor is None:
+        extractor = _worker_extractors[segmenter] = ContentExtractor()
+        extractor.segmenter = SentenceSegmenter.create(segmenter)
+    return [extractor.findings_for_abstract(abstract) for abstract in abstracts]
+
+class ContextAccumulator:
+    """Knowledge-context statistics updated incrementally as papers arrive"""
+    
+    def __init__(self, matcher: KeywordMatcher, themes: List[str], methodologies: List[str],
+                 emerging_terms: List[str], this_year: Optional[int] = None):
+        self.matcher = matcher
+        self.themes = themes
+        self.methodologies = methodologies
+        self.emerging_terms = emerging_terms
+        self.this_year = this_year or current_year()
+        
+        self.count = 0
+        self.total_citations = 0
+        self.most_cited = None
+        self._lower = []  # Max-heap (negated) of the smaller half of citation counts
+        self._upper = []  # Min-heap of the larger half
+        self.citation_bands = {"low_cited": 0, "medium_cited": 0, "high_cited": 0}
+        self.min_year = None
+        self.max_year = None
+        self.recent_papers = 0
+        self.by_decade = {}
+        self.venues = {}
+        self.quality_total = 0.0
+        self.relevance_total = 0.0
+        self.high_quality_papers = 0
+        self.author_counts = {}
+        self.author_citations = {}
+        self.theme_counts = Counter()
+        self.methods_seen = set()
+        self.recent_terms = Counter()
+        self.older_terms = Counter()
+    
+    def add(self, paper: ResearchPaper):
+        """Fold one paper into every statistic"""
+        self.count += 1
+        
+        citations = paper.citations
+        self.total_citations += citations
+        if self.most_cited is None or citations > self.most_cited.citations:
+            self.most_cited = paper
+        self._push_citations(citations)
+        if citations < 10:
+            self.citation_bands["low_cited"] += 1
+        elif citations < 100:
+            self.citation_bands["medium_cited"] += 1
+        else:
+            self.citation_bands["high_cited"] += 1
+        
+        self.min_year = paper.year if self.min_year is None else min(self.min_year, paper.year)
+        self.max_year = paper.year if self.max_year is None else max(self.max_year, paper.year)
+        recent = self.this_year - paper.year <= 3
+        self.recent_papers += recent
+        decade_key = f"{(paper.year // 10) * 10}s"
+        self.by_decade[decade_key] = self.by_decade.get(decade_key, 0) + 1
         
-        self.stop_words = set(stopwords.words('english'))
+        if paper.venue:
+            self.venues[paper.venue] = self.venues.get(paper.venue, 0) + 1
+        
+        self.quality_total += paper.quality_score
+        self.relevance_total += paper.relevance_score
+        self.high_quality_papers += paper.quality_score >= 4.0
+        
+        for author in paper.authors:
+            if author:
+                self.author_counts[author] = self.author_counts.get(author, 0) + 1
+                self.author_citations[author] = self.author_citations.get(author, 0) + citations
+        
+        # One keyword scan of each field feeds themes, methodologies and trends
+        title_counts = self.matcher.count(paper.title)
+        abstract_counts = self.matcher.count(paper.abstract)
+        if paper.title and paper.abstract:
+            self.theme_counts.update(title_counts)
+            self.theme_counts.update(abstract_counts)
+        self.methods_seen.update(abstract_counts)
+        terms = self.recent_terms if recent else self.older_terms
+        terms.update(title_counts)
+        terms.update(abstract_counts)
+    
+    def _push_citations(self, value: int):
+        """Insert into the two-heap median structure, keeping the lower half one larger at most"""
+        if not self._lower or value <= -self._lower[0]:
+            heapq.heappush(self._lower, -value)
+        else:
+            heapq.heappush(self._upper, value)
+        if len(self._lower) > len(self._upper) + 1:
+            heapq.heappush(self._upper, -heapq.heappop(self._lower))
+        elif len(self._upper) > len(self._lower):
+            heapq.heappush(self._lower, -heapq.heappop(self._upper))
+    
+    @property
+    def median_citations(self) -> float:
+        if not self.count:
+            return 0.0
+        if len(self._lower) > len(self._upper):
+            return float(-self._lower[0])
+        return (-self._lower[0] + self._upper[0]) / 2
+    
+    def summary(self) -> Dict[str, Any]:
+        """Current statistics in the knowledge-context layout"""
+        found_themes = []
+        for theme in self.themes:
+            count = self.theme_counts[theme.lower()]
+            if count >= 2:  # Appears in at least 2 papers
+                found_themes.append(f"{theme} ({count} occurrences)")
+        
+        trends = []
+        if self.recent_papers:
+            for term in self.emerging_terms:
+                # 50% increase in recent years
+                if self.recent_terms[term.lower()] > self.older_terms[term.lower()] * 1.5:
+                    trends.append(f"Increasing focus on {term}")
+        
+        top_authors = []
+        for author, count in sorted(self.author_counts.items(), key=lambda x: x[1], reverse=True)[:10]:
+            top_authors.append({
+                "name": author,
+                "paper_count": count,
+                "total_citations": self.author_citations[author]
+            })
+        
+        count = self.count or 1
+        return {
+            "total_papers": self.count,
+            "common_themes": found_themes[:10],
+            "methodologies": [m for m in self.methodologies if m.lower() in self.methods_seen][:8],
+            "recent_trends": trends[:5],
+            "citation_summary": {
+                "total_citations": self.total_citations,
+                "avg_citations": self.total_citations / count,
+                "median_citations": self.median_citations,
+                "most_cited": self.most_cited,
+                "citation_distribution": dict(self.citation_bands)
+            },
+            "temporal_analysis": {
+                "year_range": f"{self.min_year}-{self.max_year}",
+                "recent_papers": self.recent_papers,
+                "by_decade": dict(self.by_decade)
+            },
+            "venues": {
+                "total_venues": len(self.venues),
+                "top_venues": sorted(self.venues.items(), key=lambda x: x[1], reverse=True)[:5],
+                "venue_diversity": len(self.venues) / count
+            },
+            "quality_metrics": {
+                "avg_quality_score": self.quality_total / count,
+                "avg_relevance_score": self.relevance_total / count,
+                "high_quality_papers": self.high_quality_papers
+            },
+            "top_authors": top_authors
+        }
+
+class ContentExtractor:
+    """Enhanced content extraction with better insight generation"""
+    
+    THEME_KEYWORDS = [
+        "machine learning", "artificial intelligence", "deep learning", "neural networks",
+        "climate change", "sustainability", "renewable energy", "carbon",
+        "healthcare", "medical", "treatment", "therapy", "diagnosis",
+        "education", "learning", "teaching", "student", "performance",
+        "social", "economic", "policy", "government", "public",
+        "data", "analysis", "model", "algorithm", "framework"
+    ]
+    
+    METHODOLOGY_KEYWORDS = [
+        "systematic review", "meta-analysis", "randomized controlled trial", "survey",
+        "interview", "case study", "experimental", "longitudinal", "cross-sectional",
+        "qualitative", "quantitative", "mixed methods", "regression analysis",
+        "statistical analysis", "content analysis"
+    ]
+    
+    EMERGING_TERMS = ["AI", "machine learning", "deep learning", "blockchain", "IoT",
+                      "sustainability", "climate", "digital transformation", "remote"]
+    
+    # Sentence score for containing any indicator of a tier
+    FINDING_INDICATORS = {
+        3: ['found', 'discovered', 'revealed', 'demonstrated', 'concluded', 'results show'],
+        2: ['showed', 'indicated', 'suggested', 'evidence', 'significant', 'correlation'],
+        1: ['relationship', 'effect', 'impact', 'influence', 'associated', 'related']
+    }
+    STATISTICAL_TERMS = ['p <', 'significant', 'correlation', 'regression']
+    NUMERIC_PATTERN = re.compile(r'\d+\.?\d*%|\d+\.?\d*\s*(fold|times|percent)')
+    FINDING_MATCHER = KeywordMatcher([w for words in FINDING_INDICATORS.values() for w in words] +
+                                     STATISTICAL_TERMS)
+    
+    def __init__(self, config: Optional[Config] = None):
+        self.tracer = Tracer(enabled=False)
+        self.segmenter = SentenceSegmenter.create(config.get("content.segmenter", "rules") if config else "rules")
+        
+        self.theme_keywords = self._keyword_list(config, "themes", self.THEME_KEYWORDS)
+        self.methodology_keywords = self._keyword_list(config, "methodologies", self.METHODOLOGY_KEYWORDS)
+        self.emerging_terms = self._keyword_list(config, "trends", self.EMERGING_TERMS)
+        self.keyword_matcher = KeywordMatcher(self.theme_keywords + self.methodology_keywords +
+                                              self.emerging_terms)
+        
+        self.findings_cache = FindingsCache(config) if config is not None else None
+        self.process_threshold = config.get("content.findings.process_threshold", 200) if config else 0
+        self.processes = config.get("content.findings.processes", 0) if config else 0
+    
+    def new_accumulator(self) -> ContextAccumulator:
+        """Empty accumulator that papers can be streamed into"""
+        return ContextAccumulator(self.keyword_matcher, self.theme_keywords,
+                                  self.methodology_keywords, self.emerging_terms)
+    
+    @staticmethod
+    def _keyword_list(config: Optional[Config], name: str, default: List[str]) -> List[str]:
+        """Configured keywords for a dictionary: a list, or a file with one term per line"""
+        configured = config.get(f"content.keywords.{name}") if config else None
+        if not configured:
+            return list(default)
+        if isinstance(configured, str):
+            try:
+                with open(configured, "r", encoding="utf-8") as f:
+                    return [line.strip() for line in f if line.strip()]
+            except OSError as e:
+                logger.warning(f"Could not read {name} keywords from {configured}, using defaults: {e}")
+                return list(default)
+        return [str(term) for term in configured]
     
     def extract_key_findings(self, paper: ResearchPaper) -> List[str]:
         """Enhanced key findings extraction"""
-        if not paper.abstract:
-            return []
+        return self.extract_key_findings_batch([paper])[0]
+    
+    def extract_key_findings_batch(self, papers: List[ResearchPaper],
+                                   on_findings: Optional[Callable[[int, List[str]], None]] = None) -> List[List[str]]:
+        """Findings for many papers: cached abstracts are free, the rest are computed together
         
-        sentences = sent_tokenize(paper.abstract)
-        key_sentences = []
+        on_findings(index, findings) is called for each paper, in paper order, as soon as its
+        findings and those of every earlier paper are known.
+        """
+        results = [[] for _ in papers]
+        ready = [False] * len(papers)
+        delivered = 0
+        
+        def release(index: int):
+            nonlocal delivered
+            ready[index] = True
+            if on_findings is None:
+                return
+            while delivered < len(papers) and ready[delivered]:
+                on_findings(delivered, results[delivered])
+                delivered += 1
+        
+        pending = {}  # Cache key -> indices of papers sharing that abstract
+        abstracts = {}
+        hits = 0
+        with self.tracer.span("findings.batch", papers=len(papers)) as span:
+            for i, paper in enumerate(papers):
+                if not paper.abstract:
+                    release(i)
+                    continue
+                key = FindingsCache.make_key(paper.abstract, self.segmenter.name)
+                if key not in pending:
+                    cached = self.findings_cache.get(key) if self.findings_cache else None
+                    if cached is not None:
+                        results[i] = cached
+                        hits += 1
+                        release(i)
+                        continue
+                    abstracts[key] = paper.abstract
+                pending.setdefault(key, []).append(i)
+            
+            keys = list(abstracts)
+            for key, findings in zip(keys, self._compute_findings([abstracts[key] for key in keys])):
+                if self.findings_cache:
+                    self.findings_cache.put(key, findings)
+                for i in pending[key]:
+                    results[i] = list(findings)
+                    release(i)
+            span["cache_hits"] = hits
+            span["computed"] = len(keys)
+        return results
+    
+    def _compute_findings(self, abstracts: List[str]) -> Iterator[List[str]]:
+        """Yield findings in order, computed in this process or across a process pool for large batches"""
+        if not abstracts:
+            return
+        if not self.process_threshold or len(abstracts) < self.process_threshold:
+            for abstract in abstracts:
+                yield self.findings_for_abstract(abstract)
+            return
+        
+        import multiprocessing
+        
+        workers = self.processes or os.cpu_count() or 1
+        chunk_size = max(1, -(-len(abstracts) // (workers * 4)))
+        chunks = [abstracts[i:i + chunk_size] for i in range(0, len(abstracts), chunk_size)]
+        done = 0
+        try:
+            # Spawned workers avoid forking a process that is running threads
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                for chunk in pool.map(_extract_findings_worker, chunks, [self.segmenter.name] * len(chunks)):
+                    for findings in chunk:
+                        done += 1
+                        yield findings
+        except Exception as e:
+            logger.warning(f"Process pool unavailable for findings extraction, running in-process: {e}")
+            for abstract in abstracts[done:]:
+                yield self.findings_for_abstract(abstract)
+    
+    def findings_for_abstract(self, abstract: str) -> List[str]:
+        """Score each sentence of an abstract and keep the most informative ones"""
+        if not abstract:
+            return []
         
-        # Enhanced key indicators with weights
-        indicators = {
-            'high': ['found', 'discovered', 'revealed', 'demonstrated', 'concluded', 'results show'],
-            'medium': ['showed', 'indicated', 'suggested', 'evidence', 'significant', 'correlation'],
-            'low': ['relationship', 'effect', 'impact', 'influence', 'associated', 'related']
-        }
+        sentences = self.segmenter.split(abstract)
         
         scored_sentences = []
         for sentence in sentences:
-            sentence_lower = sentence.lower()
-            score = 0
-            
-            # Score based on indicators
-            for weight, words in [('high', indicators['high']), ('medium', indicators['medium']), ('low', indicators['low'])]:
-                for word in words:
-                    if word in sentence_lower:
-                        if weight == 'high':
-                            score += 3
-                        elif weight == 'medium':
-                            score += 2
-                        else:
-                            score += 1
-                        break
+            # One scan finds every indicator and statistical term in the sentence
+            present = self.FINDING_MATCHER.count(sentence).keys()
+            score = sum(weight for weight, words in self.FINDING_INDICATORS.items()
+                        if any(word in present for word in words))
             
             # Bonus for numerical data
-            if re.search(r'\d+\.?\d*%|\d+\.?\d*\s*(fold|times|percent)', sentence_lower):
+            if self.NUMERIC_PATTERN.search(sentence.lower()):
                 score += 2
             
             # Bonus for statistical terms
-            if any(term in sentence_lower for term in ['p <', 'significant', 'correlation', 'regression']):
+            if any(term in present for term in self.STATISTICAL_TERMS):
                 score += 1
             
             if score > 0:
@@ -750,187 +2242,864 @@ class ContentExtractor:
                 "error": "No papers available for context building"
             }
         
-        context = {
-            "total_papers": len(papers),
-            "key_findings": [],
-            "common_themes": self._extract_themes(papers),
-            "methodologies": self._extract_methodologies(papers),
-            "recent_trends": self._identify_trends(papers),
-            "citation_summary": {
-                "total_citations": sum(p.citations for p in papers),
-                "avg_citations": statistics.mean([p.citations for p in papers]),
-                "median_citations": statistics.median([p.citations for p in papers]),
-                "most_cited": max(papers, key=lambda p: p.citations),
-                "citation_distribution": self._analyze_citations(papers)
-            },
-            "temporal_analysis": {
-                "year_range": f"{min(p.year for p in papers)}-{max(p.year for p in papers)}",
-                "recent_papers": len([p for p in papers if datetime.now().year - p.year <= 3]),
-                "by_decade": self._analyze_by_decade(papers)
-            },
-            "venues": self._analyze_venues(papers),
-            "quality_metrics": {
-                "avg_quality_score": statistics.mean([p.quality_score for p in papers]),
-                "avg_relevance_score": statistics.mean([p.relevance_score for p in papers]),
-                "high_quality_papers": len([p for p in papers if p.quality_score >= 4.0])
-            },
-            "top_authors": self._identify_top_authors(papers)
-        }
+        context = {"total_papers": len(papers), "key_findings": []}
         
-        # Extract and categorize findings
-        for paper in papers:
-            findings = self.extract_key_findings(paper)
-            paper.key_findings = findings
+        # Extract and categorize findings; every statistic is folded in as each paper's findings
+        # arrive, while later abstracts are still being processed
+        accumulator = self.new_accumulator()
+        with self.tracer.span("context.key_findings", papers=len(papers)):
+            all_findings = self.extract_key_findings_batch(papers, lambda i, _: accumulator.add(papers[i]))
+            context.update(accumulator.summary())
             
-            for finding in findings:
-                author_name = paper.authors[0].split()[-1] if paper.authors else 'Unknown'
-                context["key_findings"].append({
-                    "text": finding,
-                    "author": author_name,
-                    "year": paper.year,
-                    "citations": paper.citations,
-                    "source": paper.source
-                })
+            for paper, findings in zip(papers, all_findings):
+                paper.key_findings = findings
+                
+                for finding in findings:
+                    author_name = paper.authors[0].split()[-1] if paper.authors else 'Unknown'
+                    context["key_findings"].append({
+                        "text": finding,
+                        "author": author_name,
+                        "year": paper.year,
+                        "citations": paper.citations,
+                        "source": paper.source
+                    })
         
         return context
+
+class LLMResponseCache:
+    """Content-addressed cache of validated section completions"""
     
-    def _extract_themes(self, papers: List[ResearchPaper]) -> List[str]:
-        """Extract common themes from paper titles and abstracts"""
-        all_text = " ".join([p.title + " " + p.abstract for p in papers if p.title and p.abstract])
-        
-        # Simple theme extraction (could be enhanced with more sophisticated NLP)
-        theme_keywords = [
-            "machine learning", "artificial intelligence", "deep learning", "neural networks",
-            "climate change", "sustainability", "renewable energy", "carbon",
-            "healthcare", "medical", "treatment", "therapy", "diagnosis",
-            "education", "learning", "teaching", "student", "performance",
-            "social", "economic", "policy", "government", "public",
-            "data", "analysis", "model", "algorithm", "framework"
-        ]
-        
-        found_themes = []
-        all_text_lower = all_text.lower()
-        
-        for theme in theme_keywords:
-            if theme in all_text_lower:
-                count = all_text_lower.count(theme)
-                if count >= 2:  # Appears in at least 2 papers
-                    found_themes.append(f"{theme} ({count} occurrences)")
-        
-        return found_themes[:10]  # Top 10 themes
-    
-    def _extract_methodologies(self, papers: List[ResearchPaper]) -> List[str]:
-        """Extract common methodologies mentioned in papers"""
-        methodology_keywords = [
-            "systematic review", "meta-analysis", "randomized controlled trial", "survey",
-            "interview", "case study", "experimental", "longitudinal", "cross-sectional",
-            "qualitative", "quantitative", "mixed methods", "regression analysis",
-            "statistical analysis", "content analysis"
-        ]
-        
-        all_text = " ".join([p.abstract for p in papers if p.abstract]).lower()
-        found_methods = []
+    def __init__(self, config: Config):
+        self.enabled = config.get("cache.llm.enabled", True)
+        self.read_only = config.get("cache.llm.read_only", False)
+        self._store = None
+        if self.enabled:
+            try:
+                self._store = DiskCache(
+                    config.get("cache.llm.path", "cache/llm_cache.sqlite"),
+                    max_bytes=int(config.get("cache.llm.max_mb", 256) * 1024 * 1024)
+                )
+            except Exception as e:
+                logger.warning(f"LLM response cache unavailable, continuing without it: {e}")
+                self.enabled = False
+    
+    @staticmethod
+    def make_key(model: str, system_prompt: str, prompt: str, temperature: float, max_tokens: int) -> str:
+        """Hash everything that determines the completion"""
+        raw = json.dumps([model, system_prompt, prompt, temperature, max_tokens])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached completion, or None on a miss"""
+        if not self._store:
+            return None
+        try:
+            return self._store.get(key)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable LLM cache entry: {e}")
+            return None
+    
+    def put(self, key: str, content: str):
+        """Store a completion unless the cache is in read-only replay mode"""
+        if not self._store or self.read_only:
+            return
+        try:
+            self._store.set(key, content)
+        except Exception as e:
+            logger.warning(f"Could not write LLM cache entry: {e}")
+
+class OpenAIClientPool:
+    """Owns one OpenAI client so its HTTP connections stay warm across sections and articles"""
+    
+    def __init__(self, config: Config):
+        self.config = config
+        self._client = None
+        self._lock = threading.Lock()
+    
+    def client(self):
+        """Return the shared client, creating it on first use"""
+        with self._lock:
+            if self._client is None:
+                import httpx
+                from openai import OpenAI
+                
+                timeout = self.config.get("generation.client.timeout", 180)
+                http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=self.config.get("generation.client.max_connections", 20),
+                        max_keepalive_connections=self.config.get("generation.client.max_keepalive_connections", 10)
+                    ),
+                    timeout=httpx.Timeout(timeout, connect=self.config.get("generation.client.connect_timeout", 10))
+                )
+                self._client = OpenAI(
+                    api_key=self.config.get("apis.openai_api_key"),
+                    max_retries=self.config.get("generation.client.max_retries", 2),
+                    timeout=timeout,
+                    http_client=http_client
+                )
+            return self._client
+    
+    def close(self):
+        """Release pooled connections"""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+@dataclass
+class LLMUsage:
+    """Token usage of one completion"""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0  # Prompt tokens served from the provider's prefix cache
+
+@dataclass
+class LLMCompletion:
+    text: str
+    usage: Optional[LLMUsage] = None
+
+class CompletionStream:
+    """Text deltas of one streamed completion; usage is set once the stream has finished"""
+    
+    def __init__(self, produce: Callable[["CompletionStream"], Any], on_close: Optional[Callable[[], None]] = None):
+        self.usage = None
+        self._deltas = produce(self)
+        self._on_close = on_close
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self) -> str:
+        return next(self._deltas)
+    
+    def close(self):
+        """Stop the completion early"""
+        self._deltas.close()
+        if self._on_close is not None:
+            self._on_close()
+
+class AsyncCompletionStream:
+    """Async counterpart of CompletionStream"""
+    
+    def __init__(self, produce: Callable[["AsyncCompletionStream"], Any]):
+        self.usage = None
+        self._deltas = produce(self)
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self) -> str:
+        return await self._deltas.__anext__()
+    
+    async def aclose(self):
+        await self._deltas.aclose()
+
+class LLMProvider(ABC):
+    """Chat completion backend; subclasses register under a generation.provider name"""
+    
+    name = ""
+    requires_api_key = False
+    
+    @abstractmethod
+    def complete(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                 max_tokens: int) -> LLMCompletion:
+        """Return the whole completion for messages"""
+    
+    @abstractmethod
+    def stream(self, model: str, messages: List[Dict[str, str]], temperature: float,
+               max_tokens: int) -> CompletionStream:
+        """Return a stream of content deltas for messages"""
+    
+    async def acomplete(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                        max_tokens: int) -> LLMCompletion:
+        import asyncio
         
-        for method in methodology_keywords:
-            if method in all_text:
-                found_methods.append(method)
+        return await asyncio.to_thread(self.complete, model, messages, temperature, max_tokens)
+    
+    def astream(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                max_tokens: int) -> AsyncCompletionStream:
+        """Drive the blocking stream from a worker thread, one delta at a time"""
+        async def produce(stream: AsyncCompletionStream):
+            import asyncio
+            
+            blocking = await asyncio.to_thread(self.stream, model, messages, temperature, max_tokens)
+            try:
+                while (delta := await asyncio.to_thread(next, blocking, None)) is not None:
+                    yield delta
+                stream.usage = blocking.usage
+            finally:
+                blocking.close()
         
-        return found_methods[:8]  # Top 8 methodologies
+        return AsyncCompletionStream(produce)
+    
+    def close(self):
+        """Release connections"""
     
-    def _identify_trends(self, papers: List[ResearchPaper]) -> List[str]:
-        """Identify temporal trends in research"""
-        current_year = datetime.now().year
-        recent_papers = [p for p in papers if current_year - p.year <= 3]
-        older_papers = [p for p in papers if current_year - p.year > 3]
+    @staticmethod
+    def create(config: Config) -> "LLMProvider":
+        """Build the provider configured as generation.provider"""
+        providers = {"openai": OpenAIProvider, "stub": StubProvider}
+        name = config.get("generation.provider", "openai")
+        if name not in providers:
+            raise ValueError(f"Unknown LLM provider '{name}' (expected one of: {', '.join(providers)})")
+        return providers[name](config)
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI chat completions over a pooled client"""
+    
+    name = "openai"
+    requires_api_key = True
+    
+    def __init__(self, config: Config, client_pool: Optional[OpenAIClientPool] = None):
+        self.config = config
+        self.client_pool = client_pool if client_pool is not None else OpenAIClientPool(config)
+        self._async_client = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _usage(usage: Any) -> Optional[LLMUsage]:
+        if usage is None:
+            return None
+        details = getattr(usage, "prompt_tokens_details", None)
+        return LLMUsage(
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            cached_tokens=(getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+        )
+    
+    def complete(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                 max_tokens: int) -> LLMCompletion:
+        response = self.client_pool.client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_completion_tokens=max_tokens
+        )
+        return LLMCompletion(response.choices[0].message.content or "", self._usage(response.usage))
+    
+    def stream(self, model: str, messages: List[Dict[str, str]], temperature: float,
+               max_tokens: int) -> CompletionStream:
+        response = self.client_pool.client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_completion_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
         
-        trends = []
+        def produce(stream: CompletionStream):
+            for chunk in response:
+                if getattr(chunk, "usage", None) is not None:
+                    stream.usage = self._usage(chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
         
-        if recent_papers:
-            recent_text = " ".join([p.title + " " + p.abstract for p in recent_papers]).lower()
-            older_text = " ".join([p.title + " " + p.abstract for p in older_papers]).lower()
-            
-            emerging_terms = ["AI", "machine learning", "deep learning", "blockchain", "IoT", 
-                             "sustainability", "climate", "digital transformation", "remote"]
-            
-            for term in emerging_terms:
-                recent_count = recent_text.count(term.lower())
-                older_count = older_text.count(term.lower()) if older_text else 0
+        # Closing drops the connection, which stops generation server-side
+        return CompletionStream(produce, on_close=response.close)
+    
+    def _async(self):
+        with self._lock:
+            if self._async_client is None:
+                from openai import AsyncOpenAI
                 
-                if recent_count > older_count * 1.5:  # 50% increase in recent years
-                    trends.append(f"Increasing focus on {term}")
+                self._async_client = AsyncOpenAI(
+                    api_key=self.config.get("apis.openai_api_key"),
+                    max_retries=self.config.get("generation.client.max_retries", 2),
+                    timeout=self.config.get("generation.client.timeout", 180)
+                )
+            return self._async_client
+    
+    async def acomplete(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                        max_tokens: int) -> LLMCompletion:
+        response = await self._async().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_completion_tokens=max_tokens
+        )
+        return LLMCompletion(response.choices[0].message.content or "", self._usage(response.usage))
+    
+    def astream(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                max_tokens: int) -> AsyncCompletionStream:
+        async def produce(stream: AsyncCompletionStream):
+            response = await self._async().chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_completion_tokens=max_tokens,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            try:
+                async for chunk in response:
+                    if getattr(chunk, "usage", None) is not None:
+                        stream.usage = self._usage(chunk.usage)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await response.close()
+        
+        return AsyncCompletionStream(produce)
+    
+    def close(self):
+        self.client_pool.close()
+        self._async_client = None
+
+class StubProviderError(RuntimeError):
+    """Failure injected by StubProvider"""
+
+class StubProvider(LLMProvider):
+    """Deterministic offline backend with injectable latency and errors, for benchmarks and load tests"""
+    
+    name = "stub"
+    
+    TOPIC = re.compile(r'"([^"]+)"')
+    TARGET_WORDS = re.compile(r'(?:approximately|about) (\d+)(?: more)? words')
+    OPENERS = ["", "", "Moreover, ", "In addition, ", "However, ", "Consequently, ", "Notably, ", "Taken together, "]
+    SUBJECTS = ["prior studies", "recent evidence", "longitudinal research", "the reviewed literature",
+                "experimental work", "comparative analyses", "systematic reviews", "survey data"]
+    VERBS = ["suggest", "indicate", "demonstrate", "highlight", "question", "clarify", "extend", "support"]
+    OBJECTS = ["a consistent relationship between key variables", "important contextual differences",
+               "the role of methodological choices", "measurable effects on practice",
+               "gaps that warrant further investigation", "the value of mixed-method designs",
+               "trade-offs between scale and depth", "moderating effects of institutional factors"]
+    AUTHORS = ["Smith", "Chen", "Garcia", "Okafor", "Nguyen", "Kowalski", "Haddad", "Larsen"]
+    
+    def __init__(self, config: Config):
+        self.latency = config.get("generation.stub.latency_ms", 50) / 1000  # Before the first token
+        self.tokens_per_second = config.get("generation.stub.tokens_per_second", 0)  # 0 streams instantly
+        self.error_rate = config.get("generation.stub.error_rate", 0.0)
+        self.words = config.get("generation.stub.words", 0)  # 0 follows the length the prompt asks for
+        self._random = random.Random(config.get("generation.stub.seed", 0))
+        self._seen_prefixes = set()
+        self._lock = threading.Lock()
+    
+    def _plan(self, model: str, messages: List[Dict[str, str]], max_tokens: int) -> Tuple[List[str], LLMUsage]:
+        """Deltas and usage for a request; the same request always gets the same text"""
+        with self._lock:
+            if self._random.random() < self.error_rate:
+                raise StubProviderError("Injected stub provider error")
+            prefix = hashlib.sha256(messages[0]["content"].encode("utf-8")).digest()
+            cached = prefix in self._seen_prefixes
+            self._seen_prefixes.add(prefix)
+        
+        prompt = messages[-1]["content"]
+        seed = hashlib.sha256(json.dumps([model, messages], sort_keys=True).encode("utf-8")).digest()
+        rng = random.Random(seed)
+        topic_match = self.TOPIC.search(messages[1]["content"]) if len(messages) > 1 else None
+        topic = topic_match.group(1) if topic_match else "this field"
+        
+        if "Generate only the title" in prompt:
+            text = f"{topic.title()}: A Systematic Review of Evidence, Methods and Emerging Directions"
+        else:
+            target_match = self.TARGET_WORDS.search(prompt)
+            words = self.words or (int(target_match.group(1)) if target_match else 300)
+            words = min(words, int(max_tokens / 1.4))  # A real model stops at the token limit too
+            paragraphs, sentences, count = [], [], 0
+            while count < words:
+                sentence = (f"{rng.choice(self.OPENERS)}{rng.choice(self.SUBJECTS)} on {topic} "
+                            f"{rng.choice(self.VERBS)} {rng.choice(self.OBJECTS)} "
+                            f"({rng.choice(self.AUTHORS)}, {rng.randint(2012, 2024)}).")
+                sentence = sentence[0].upper() + sentence[1:]
+                sentences.append(sentence)
+                count += len(sentence.split())
+                if len(sentences) == 5:
+                    paragraphs.append(" ".join(sentences))
+                    sentences = []
+            if sentences:
+                paragraphs.append(" ".join(sentences))
+            text = "\n\n".join(paragraphs)
+        
+        tokens = text.split(" ")
+        deltas = [" ".join(tokens[i:i + 3]) + (" " if i + 3 < len(tokens) else "") for i in range(0, len(tokens), 3)]
+        prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+        system_tokens = len(messages[0]["content"]) // 4
+        usage = LLMUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=int(len(tokens) * 1.33),
+            # Like provider prefix caching: a repeated prefix of 1024+ tokens, in 128-token steps
+            cached_tokens=system_tokens // 128 * 128 if cached and system_tokens >= 1024 else 0
+        )
+        return deltas, usage
+    
+    def _delta_delay(self, delta: str) -> float:
+        return len(delta.split()) * 1.33 / self.tokens_per_second if self.tokens_per_second else 0.0
+    
+    def complete(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                 max_tokens: int) -> LLMCompletion:
+        deltas, usage = self._plan(model, messages, max_tokens)
+        time.sleep(self.latency + sum(self._delta_delay(d) for d in deltas))
+        return LLMCompletion("".join(deltas), usage)
+    
+    def stream(self, model: str, messages: List[Dict[str, str]], temperature: float,
+               max_tokens: int) -> CompletionStream:
+        deltas, usage = self._plan(model, messages, max_tokens)
+        
+        def produce(stream: CompletionStream):
+            time.sleep(self.latency)
+            for delta in deltas:
+                yield delta
+                time.sleep(self._delta_delay(delta))
+            stream.usage = usage
+        
+        return CompletionStream(produce)
+    
+    async def acomplete(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                        max_tokens: int) -> LLMCompletion:
+        import asyncio
         
-        return trends[:5]
+        deltas, usage = self._plan(model, messages, max_tokens)
+        await asyncio.sleep(self.latency + sum(self._delta_delay(d) for d in deltas))
+        return LLMCompletion("".join(deltas), usage)
     
-    def _analyze_citations(self, papers: List[ResearchPaper]) -> Dict[str, int]:
-        """Analyze citation distribution"""
-        citations = [p.citations for p in papers]
-        return {
-            "low_cited": len([c for c in citations if c < 10]),
-            "medium_cited": len([c for c in citations if 10 <= c < 100]),
-            "high_cited": len([c for c in citations if c >= 100])
-        }
+    def astream(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                max_tokens: int) -> AsyncCompletionStream:
+        async def produce(stream: AsyncCompletionStream):
+            import asyncio
+            
+            deltas, usage = self._plan(model, messages, max_tokens)
+            await asyncio.sleep(self.latency)
+            for delta in deltas:
+                yield delta
+                await asyncio.sleep(self._delta_delay(delta))
+            stream.usage = usage
+        
+        return AsyncCompletionStream(produce)
+
+class TokenCounter:
+    """Counts prompt tokens locally: tiktoken when installed, a character/word estimate otherwise"""
     
-    def _analyze_by_decade(self, papers: List[ResearchPaper]) -> Dict[str, int]:
-        """Analyze papers by decade"""
-        decades = {}
-        for paper in papers:
-            decade = (paper.year // 10) * 10
-            decade_key = f"{decade}s"
-            decades[decade_key] = decades.get(decade_key, 0) + 1
-        return decades
-    
-    def _analyze_venues(self, papers: List[ResearchPaper]) -> Dict[str, Any]:
-        """Analyze publication venues"""
-        venues = {}
-        for paper in papers:
-            if paper.venue:
-                venues[paper.venue] = venues.get(paper.venue, 0) + 1
+    def __init__(self, model: str):
+        self.model = model
+        self._encoding = None
+        self._loaded = False
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        import tiktoken
+                        try:
+                            self._encoding = tiktoken.encoding_for_model(self.model)
+                        except KeyError:
+                            self._encoding = tiktoken.get_encoding("o200k_base")
+                    except Exception as e:
+                        logger.info(f"tiktoken unavailable, estimating token counts: {e}")
+                    self._loaded = True
+        return self._encoding
+    
+    @property
+    def exact(self) -> bool:
+        return self._load() is not None
+    
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        encoding = self._load()
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+        # English prose averages about four characters or three quarters of a word per token
+        return int(max(len(text) / 4, len(text.split()) * 1.33)) + 1
+
+class ContextPacker:
+    """Packs the research context into a token budget, most relevant findings for the section first"""
+    
+    # What each section needs from the findings, used to rank them
+    SECTION_FOCUS = {
+        "title": "main topic trend novel approach",
+        "abstract": "objective method found results show significant implications",
+        "introduction": "background problem gap importance impact challenge need",
+        "literature_review": "studies review found evidence theory framework limitations gap compared previous",
+        "method": "method design sample participants data collected survey interview experiment model analysis regression",
+        "results": "results found showed significant increase decrease effect correlation percent times",
+        "conclusion": "implications future research recommend limitations policy practice contribution"
+    }
+    
+    def __init__(self, config: Config, counter: TokenCounter):
+        self.config = config
+        self.counter = counter
+        self.scorer = BM25Scorer(k1=config.get("search.bm25.k1", 1.5), b=config.get("search.bm25.b", 0.75),
+                                 title_weight=1.0, abstract_weight=0.0,
+                                 title_phrase_boost=0.0, abstract_phrase_boost=0.0)
+    
+    def budget(self, section_type: str) -> int:
+        """Prompt tokens allowed for the context of a section"""
+        return self.config.get(f"generation.context_budgets.{section_type}",
+                               self.config.get("generation.context_budget_tokens", 1500))
+    
+    def rank_findings(self, findings: List[Any], section_type: str) -> List[Any]:
+        """Order findings by relevance to the section's goal, then by citations"""
+        import numpy as np
         
-        return {
-            "total_venues": len(venues),
-            "top_venues": sorted(venues.items(), key=lambda x: x[1], reverse=True)[:5],
-            "venue_diversity": len(venues) / len(papers) if papers else 0
-        }
+        if not findings:
+            return []
+        texts = [f["text"] if isinstance(f, dict) else str(f) for f in findings]
+        focus = self.SECTION_FOCUS.get(section_type, "")
+        scores = self.scorer.score(focus, texts, texts) if focus else np.zeros(len(texts))
+        scores = scores + 0.1 * np.log1p([f.get("citations", 0) if isinstance(f, dict) else 0 for f in findings])
+        order = np.argsort(-scores, kind="stable")
+        return [findings[i] for i in order.tolist()]
     
-    def _identify_top_authors(self, papers: List[ResearchPaper]) -> List[Dict[str, Any]]:
-        """Identify most frequent authors"""
-        author_counts = {}
-        author_citations = {}
+    def pack(self, context: Dict[str, Any], section_type: str = "", budget: Optional[int] = None) -> str:
+        """Summary statistics and themes, then as many ranked findings as the budget allows"""
+        if context.get("error"):
+            return f"Limited research context available. {context.get('error')}"
         
-        for paper in papers:
-            for author in paper.authors:
-                if author:
-                    author_counts[author] = author_counts.get(author, 0) + 1
-                    author_citations[author] = author_citations.get(author, 0) + paper.citations
+        budget = self.budget(section_type) if budget is None else budget
+        formatted = f"""
+Research Context Summary:
+- Total Papers Analyzed: {context['total_papers']}
+- Citation Statistics: 
+  * Total Citations: {context['citation_summary']['total_citations']}
+  * Average Citations: {context['citation_summary']['avg_citations']:.1f}
+  * Median Citations: {context['citation_summary']['median_citations']:.1f}
+- Time Span: {context['temporal_analysis']['year_range']}
+- Recent Research: {context['temporal_analysis']['recent_papers']} papers from last 3 years
+- Quality Metrics:
+  * Average Quality Score: {context['quality_metrics']['avg_quality_score']:.2f}
+  * High Quality Papers: {context['quality_metrics']['high_quality_papers']}
+
+"""
         
-        top_authors = []
-        for author, count in sorted(author_counts.items(), key=lambda x: x[1], reverse=True)[:10]:
-            top_authors.append({
-                "name": author,
-                "paper_count": count,
-                "total_citations": author_citations[author]
-            })
+        summary = ""
+        # Add common themes
+        if context.get('common_themes'):
+            summary += f"Common Themes: {', '.join(context['common_themes'][:5])}\n\n"
         
-        return top_authors
+        # Add methodologies
+        if context.get('methodologies'):
+            summary += f"Common Methodologies: {', '.join(context['methodologies'][:5])}\n\n"
+        
+        # Add recent trends
+        if context.get('recent_trends'):
+            summary += f"Recent Trends: {', '.join(context['recent_trends'])}\n\n"
+        
+        # Fill what is left of the budget with findings, most relevant first
+        remaining = budget - self.counter.count(formatted) - self.counter.count(summary)
+        header = "Key Research Findings:\n"
+        lines = []
+        if context.get('key_findings') and remaining > self.counter.count(header):
+            remaining -= self.counter.count(header)
+            for finding in self.rank_findings(context['key_findings'], section_type):
+                if isinstance(finding, dict):
+                    line = f"{len(lines) + 1}. {finding['text']} ({finding['author']}, {finding['year']})\n"
+                else:
+                    line = f"{len(lines) + 1}. {finding}\n"
+                cost = self.counter.count(line)
+                if cost > remaining:
+                    continue  # A shorter finding further down may still fit
+                lines.append(line)
+                remaining -= cost
+        if lines:
+            formatted += header + "".join(lines) + "\n"
+        
+        return formatted + summary
+
+class StreamValidator:
+    """Checks a completion for hard failures while it streams, one delta at a time"""
+    
+    def __init__(self, max_words: int, placeholders: List[str]):
+        self.max_words = max_words
+        self.placeholders = [p.lower() for p in placeholders]  # The window is lowercased
+        self.words = 0
+        self.detail = ""
+        self._in_word = False
+        self._tail = ""
+        self._overlap = max(len(p) for p in placeholders) - 1 if placeholders else 0
+    
+    def feed(self, delta: str) -> Optional[str]:
+        """Account for the delta and return "placeholder" or "too_long" to abort, None to keep streaming"""
+        if not delta:
+            return None
+        starts = len(re.findall(r'(?<!\S)\S', delta))
+        if self._in_word and not delta[0].isspace():
+            starts -= 1  # The delta continues the previous word
+        self.words += starts
+        self._in_word = not delta[-1].isspace()
+        
+        # Placeholders may straddle deltas, so keep the end of the previous one
+        window = self._tail + delta.lower()
+        self._tail = window[-self._overlap:] if self._overlap else ""
+        for placeholder in self.placeholders:
+            if placeholder in window:
+                self.detail = f"placeholder {placeholder!r}"
+                return "placeholder"
+        if self.words > self.max_words:
+            self.detail = f"more than {self.max_words} words"
+            return "too_long"
+        return None
+
+class PartialSectionWriter:
+    """Writes each section's text to its own file as the completion streams in
+    
+    Accepted sections go into the final document, so their files are removed; what stays
+    behind is the text of sections that failed or were cut off by a crash.
+    """
+    
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._files = {}
+        self._lock = threading.Lock()
+    
+    def path(self, section_type: str) -> Path:
+        return self.directory / f"{section_type}.md"
+    
+    def begin(self, section_type: str):
+        """Start a new attempt, discarding text from an earlier one"""
+        with self._lock:
+            self._close(section_type)
+            self._files[section_type] = open(self.path(section_type), "w", encoding="utf-8")
+    
+    def write(self, section_type: str, text: str):
+        handle = self._files.get(section_type)
+        if handle is not None:
+            handle.write(text)
+            handle.flush()
+    
+    def end(self, section_type: str, accepted: bool):
+        with self._lock:
+            self._close(section_type)
+            if accepted:
+                self.path(section_type).unlink(missing_ok=True)
+    
+    def finish(self):
+        """Close open files and remove the directory if nothing was left in it"""
+        with self._lock:
+            for section_type in list(self._files):
+                self._close(section_type)
+        for directory in (self.directory, self.directory.parent):
+            try:
+                directory.rmdir()
+            except OSError:
+                break  # Not empty: keep it for inspection
+    
+    def _close(self, section_type: str):
+        handle = self._files.pop(section_type, None)
+        if handle is not None:
+            handle.close()
 
 class ArticleGenerator:
     """Enhanced article generator with retry logic and better prompts"""
     
-    def __init__(self, config: Config):
+    SYSTEM_PROMPT = (
+        "You are an expert academic writer specializing in research articles. "
+        "Write in formal academic style with proper citations. "
+        "Focus on clarity, coherence, and academic rigor."
+    )
+    
+    PLACEHOLDERS = ["[insert", "todo", "placeholder", "xxx", "fill in"]  # Matched case-insensitively
+    SCHEDULER_POLL_SECONDS = 0.5  # Longest the section scheduler waits between deadline checks
+    
+    def __init__(self, config: Config, response_cache: Optional[LLMResponseCache] = None,
+                 provider: Optional[LLMProvider] = None):
         self.config = config
-        openai.api_key = config.get("apis.openai_api_key")
-        self.model = config.get("generation.model", "gpt-4")
+        self.response_cache = response_cache if response_cache is not None else LLMResponseCache(config)
+        self.provider = provider if provider is not None else LLMProvider.create(config)
+        self.cache_stats = {"hits": 0, "misses": 0}
+        self.usage_stats = {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0,
+                            "streams": 0, "aborted_streams": 0, "first_token_seconds": 0.0}
+        self.section_stats = {}  # Per-section attempts, repairs and token usage
+        self.stream_sink = None  # Object with begin/write/end(section_type, ...), e.g. PartialSectionWriter
+        self._stats_lock = threading.Lock()
+        self.tracer = Tracer(enabled=False)
+        self.model = config.get("generation.model", "gpt-5-mini")
         self.fallback_model = config.get("generation.fallback_model", "gpt-3.5-turbo")
         self.retry_attempts = config.get("generation.retry_attempts", 3)
+        self.token_counter = TokenCounter(self.model)
+        self.context_packer = ContextPacker(config, self.token_counter)
+    
+    def generate_sections(self, section_types: List[str], context: Dict[str, Any],
+                          refined_topic: Dict[str, str], papers: List[ResearchPaper] = None,
+                          completed: Optional[Dict[str, ArticleSection]] = None,
+                          on_section: Optional[Callable[[str, ArticleSection], None]] = None) -> List[ArticleSection]:
+        """Generate independent sections concurrently, returning them in the requested order"""
+        concurrency = max(1, self.config.get("generation.concurrency", 3))
+        section_timeout = self.config.get("generation.section_timeout", 300)
+        # Sections finished by an earlier run are reused as they are
+        results = {section_type: section for section_type, section in (completed or {}).items()
+                   if section_type in section_types}
+        all_section_types = section_types
+        section_types = [section_type for section_type in section_types if section_type not in results]
+        if not section_types:
+            return [results[section_type] for section_type in all_section_types]
+        
+        cancel_events = {section_type: threading.Event() for section_type in section_types}
+        # Without papers every section falls back before prompting, so there is nothing to pack
+        shared_context = self.shared_context(context) if self.shared_prefix and context.get("total_papers") else None
+        finished = queue.Queue()
+        started = {}
+        
+        def run(section_type: str):
+            # The clock starts when the worker picks the section up, not when it is queued
+            started[section_type] = time.monotonic()
+            try:
+                section = self.generate_section(section_type, context, refined_topic, papers,
+                                                cancel_events[section_type], shared_context)
+                finished.put((section_type, section, None))
+            except BaseException as e:
+                finished.put((section_type, None, e))
+        
+        from tqdm import tqdm
+        
+        # Each section runs on its own thread: a timed-out worker that ignores its cancel event
+        # is abandoned and no longer counts towards concurrency, so it cannot starve the queue
+        waiting = list(section_types)
+        running = set()
+        progress = tqdm(total=len(section_types), desc="Generating sections")
+        try:
+            while waiting or running:
+                while waiting and len(running) < concurrency:
+                    section_type = waiting.pop(0)
+                    running.add(section_type)
+                    threading.Thread(target=run, args=(section_type,), name=f"section-{section_type}",
+                                     daemon=True).start()
+                
+                now = time.monotonic()
+                deadlines = [started[s] + section_timeout for s in running if s in started]
+                timeout = max(0.0, min(deadlines + [now + self.SCHEDULER_POLL_SECONDS]) - now)
+                try:
+                    section_type, section, error = finished.get(timeout=timeout)
+                except queue.Empty:
+                    pass
+                else:
+                    # Results of abandoned workers arrive late and are ignored
+                    if section_type in running:
+                        running.discard(section_type)
+                        if error is not None and not isinstance(error, Exception):
+                            raise error
+                        if error is not None:
+                            logger.error(f"Failed to generate {section_type}: {error}")
+                            section = self._create_fallback_section(section_type, refined_topic)
+                        else:
+                            logger.info(f"Successfully generated {section_type} ({section.word_count} words)")
+                        results[section_type] = section
+                        if on_section is not None:
+                            on_section(section_type, section)
+                        progress.update(1)
+                
+                now = time.monotonic()
+                for section_type in [s for s in running if s in started and now - started[s] >= section_timeout]:
+                    running.discard(section_type)
+                    cancel_events[section_type].set()
+                    logger.error(f"Generating {section_type} exceeded {section_timeout}s, using fallback content")
+                    results[section_type] = self._create_fallback_section(section_type, refined_topic)
+                    progress.update(1)
+        except BaseException:
+            for event in cancel_events.values():
+                event.set()
+            raise
+        finally:
+            progress.close()
+        
+        return [results[section_type] for section_type in all_section_types]
     
     def generate_section(self, section_type: str, context: Dict[str, Any], 
-                        refined_topic: Dict[str, str], papers: List[ResearchPaper] = None) -> ArticleSection:
+                        refined_topic: Dict[str, str], papers: List[ResearchPaper] = None,
+                        cancel_event: Optional[threading.Event] = None,
+                        shared_context: Optional[str] = None) -> ArticleSection:
         """Enhanced section generation with retry logic and better error handling"""
         
         if not context.get("total_papers", 0):
             logger.warning(f"No papers available for {section_type} generation")
             return self._create_fallback_section(section_type, refined_topic)
         
+        messages = self.build_messages(section_type, context, refined_topic, shared_context)
+        model = self.model
+        temperature = self.config.get("generation.temperature", 1.0)
+        max_tokens = self.completion_budget(section_type)
+        # Completions from other providers must never be replayed as OpenAI ones
+        cache_model = model if self.provider.name == "openai" else f"{self.provider.name}/{model}"
+        cache_key = self.response_cache.make_key(cache_model, messages[0]["content"], messages[1]["content"],
+                                                 temperature, max_tokens)
+        use_cache = True
+        
+        # Try generation with retries
+        for attempt in range(self.retry_attempts):
+            if cancel_event is not None and cancel_event.is_set():
+                logger.warning(f"Generation of {section_type} was cancelled")
+                break
+            self._count_section(section_type, "attempts")
+            try:
+                with self.tracer.span(f"section.{section_type}", attempt=attempt + 1) as span:
+                    content = self.response_cache.get(cache_key) if use_cache else None
+                    from_cache = content is not None
+                    with self._stats_lock:
+                        self.cache_stats["hits" if from_cache else "misses"] += 1
+                    span["cache_hit"] = from_cache
+                    
+                    if from_cache:
+                        logger.info(f"Using cached completion for {section_type}")
+                        if self.stream_sink is not None:
+                            self.stream_sink.begin(section_type)
+                            self.stream_sink.write(section_type, content)
+                        failure = self._validation_failure(content, section_type)
+                    else:
+                        self._count_section(section_type, "generations")
+                        content, aborted = self._complete(section_type, model, messages, temperature,
+                                                          max_tokens, span, cancel_event)
+                        failure = aborted or self._validation_failure(content, section_type)
+                        if self.config.get("generation.repair.enabled", True):
+                            content, failure = self._repair(section_type, model, messages, temperature, content,
+                                                            failure, span, cancel_event,
+                                                            truncated=aborted == "too_long")
+                    
+                    valid = failure is None
+                    span["valid"] = valid
+                    if not valid:
+                        span["failure"] = failure
+                    if self.stream_sink is not None:
+                        self.stream_sink.end(section_type, valid)
+                
+                # Validate generated content
+                if valid:
+                    if not from_cache:
+                        self.response_cache.put(cache_key, content)
+                    repaired = span.get("trims") or span.get("continuations")
+                    self._set_outcome(section_type, "cached" if from_cache else "repaired" if repaired else "generated")
+                    return ArticleSection(
+                        title=section_type.replace("_", " ").title(),
+                        content=content
+                    )
+                else:
+                    # A cached completion that no longer validates must not be replayed again
+                    use_cache = False
+                    logger.warning(f"Generated content for {section_type} failed validation ({failure}), retrying...")
+                    
+            except Exception as e:
+                import sys
+                lineno = sys.exc_info()[2].tb_lineno
+                logger.error(f"Error generating {section_type} (attempt {attempt + 1}) at line {lineno}: {e}")
+                if self.stream_sink is not None:
+                    self.stream_sink.end(section_type, False)
+                if attempt == self.retry_attempts - 1:
+                    logger.error(f"All attempts failed for {section_type}")
+                    self._set_outcome(section_type, "fallback")
+                    return self._create_fallback_section(section_type, refined_topic)
+                # Exponential backoff, cut short if the section is cancelled
+                if cancel_event is not None:
+                    cancel_event.wait(2 ** attempt)
+                else:
+                    time.sleep(2 ** attempt)
+        
+        self._set_outcome(section_type, "fallback")
+        return self._create_fallback_section(section_type, refined_topic)
+    
+    @property
+    def shared_prefix(self) -> bool:
+        return self.config.get("generation.prompt_layout", "shared_prefix") == "shared_prefix"
+    
+    def shared_context(self, context: Dict[str, Any]) -> str:
+        """Context packed once for the whole article, the same bytes for every section"""
+        budget = self.config.get("generation.shared_context_budget_tokens", 3000)
+        return self.context_packer.pack(context, budget=budget)
+    
+    def build_messages(self, section_type: str, context: Dict[str, Any], refined_topic: Dict[str, str],
+                       shared_context: Optional[str] = None) -> List[Dict[str, str]]:
+        """Chat messages for a section in the configured prompt layout"""
         prompts = {
             "title": self._get_title_prompt(),
             "abstract": self._get_abstract_prompt(),
@@ -944,8 +3113,16 @@ class ArticleGenerator:
         if section_type not in prompts:
             raise ValueError(f"Unknown section type: {section_type}")
         
-        # Enhanced context formatting
-        formatted_context = self._format_context(context, papers)
+        if self.shared_prefix:
+            # Everything before the section instructions is identical across the article's sections
+            if shared_context is None:
+                shared_context = self.shared_context(context)
+            system_prompt = f"{self.SYSTEM_PROMPT}\n\nResearch Context:\n{shared_context}"
+            formatted_context = "see the research context above"
+        else:
+            # Context packed into this section's token budget
+            system_prompt = self.SYSTEM_PROMPT
+            formatted_context = self.context_packer.pack(context, section_type)
         
         prompt = prompts[section_type].format(
             topic=refined_topic["title"],
@@ -953,58 +3130,225 @@ class ArticleGenerator:
             context=formatted_context,
             target_words=self.config.get(f"generation.target_word_counts.{section_type}", 500)
         )
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _complete(self, section_type: str, model: str, messages: List[Dict[str, str]], temperature: float,
+                  max_tokens: int, span: Dict[str, Any], cancel_event: Optional[threading.Event] = None,
+                  prefix: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """Request a completion, streamed when enabled; returns the text and the reason it was aborted"""
+        if self.config.get("generation.streaming.enabled", True):
+            return self._stream_completion(section_type, model, messages, temperature, max_tokens,
+                                           span, cancel_event, prefix)
+        
+        completion = self.provider.complete(model, messages, temperature, max_tokens)
+        self._record_usage(completion.usage, span, section_type)
+        
+        return completion.text.strip(), None
+    
+    def _stream_completion(self, section_type: str, model: str, messages: List[Dict[str, str]],
+                           temperature: float, max_tokens: int, span: Dict[str, Any],
+                           cancel_event: Optional[threading.Event] = None,
+                           prefix: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """Stream a completion, validating as it arrives; text continues prefix when one is given"""
+        validator = StreamValidator(self.config.get("quality.max_section_words", 2500), self.PLACEHOLDERS)
+        if prefix:
+            validator.feed(prefix + "\n\n")
+        if self.stream_sink is not None:
+            if prefix:
+                self.stream_sink.write(section_type, "\n\n")
+            else:
+                self.stream_sink.begin(section_type)
         
-        # Try generation with retries
-        for attempt in range(self.retry_attempts):
-            try:
-                from openai import OpenAI
-                current_model = self.model if attempt < 2 else self.fallback_model
-                openai_api_key = self.config.get("apis.openai_api_key")
-                client = OpenAI(api_key=openai_api_key)
-
-                response = client.chat.completions.create(
-                model="gpt-5-mini", #current_model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are an expert academic writer specializing in research articles. "
-                            "Write in formal academic style with proper citations. "
-                            "Focus on clarity, coherence, and academic rigor."
-                        )
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.config.get("generation.temperature", 1.0),
-                max_completion_tokens=self.config.get("generation.max_completion_tokens", 3500)
-                )
-
-                content = response.choices[0].message.content.strip()
-                
-                # Validate generated content
-                if self._validate_content(content, section_type):
-                    return ArticleSection(
-                        title=section_type.replace("_", " ").title(),
-                        content=content
-                    )
-                else:
-                    logger.warning(f"Generated content for {section_type} failed validation, retrying...")
-                    
-            except Exception as e:
-                import sys
-                lineno = sys.exc_info()[2].tb_lineno
-                logger.error(f"Error generating {section_type} (attempt {attempt + 1}) at line {lineno}: {e}")
-                if attempt == self.retry_attempts - 1:
-                    logger.error(f"All attempts failed for {section_type}")
-                    return self._create_fallback_section(section_type, refined_topic)
-                time.sleep(2 ** attempt)  # Exponential backoff
+        started = time.monotonic()
+        stream = self.provider.stream(model, messages, temperature, max_tokens)
+        parts = []
+        first_token = None
+        abort_reason = None
+        try:
+            for delta in stream:
+                if first_token is None:
+                    first_token = time.monotonic() - started
+                    span["first_token_ms"] = round(first_token * 1000, 1)
+                abort_reason = validator.feed(delta)
+                if abort_reason is None and cancel_event is not None and cancel_event.is_set():
+                    abort_reason = "cancelled"
+                if abort_reason is not None:
+                    break
+                parts.append(delta)
+                if self.stream_sink is not None:
+                    self.stream_sink.write(section_type, delta)
+        finally:
+            stream.close()
+        self._record_usage(stream.usage, span, section_type)
+        
+        text = "".join(parts).strip()
+        with self._stats_lock:
+            self.usage_stats["streams"] += 1
+            if first_token is not None:
+                self.usage_stats["first_token_seconds"] += first_token
+            if abort_reason is not None:
+                self.usage_stats["aborted_streams"] += 1
+                # Aborted streams never receive the usage chunk, so estimate what they produced
+                stats = self.section_stats.setdefault(section_type, {})
+                stats["aborted_tokens_estimate"] = stats.get("aborted_tokens_estimate", 0) + self.token_counter.count(text)
+        if abort_reason is not None:
+            span["aborted"] = abort_reason
+            logger.warning(f"Aborted {section_type} stream after {validator.words} words: "
+                           f"{validator.detail or abort_reason}")
+        return text, abort_reason
+    
+    def _repair(self, section_type: str, model: str, messages: List[Dict[str, str]], temperature: float,
+                content: str, failure: Optional[str], span: Dict[str, Any],
+                cancel_event: Optional[threading.Event] = None,
+                truncated: bool = False) -> Tuple[str, Optional[str]]:
+        """Fix a length failure in place: trim an overlong section, continue a short one"""
+        # truncated marks text from a stream aborted for length, which stops mid-paragraph
+        max_words = self.config.get("quality.max_section_words", 2500)
+        max_continuations = self.config.get("generation.repair.max_continuations", 2)
+        continuations = 0
+        trims = 0
+        
+        while failure in ("too_short", "too_long"):
+            if failure == "too_long":
+                trimmed = self._trim_to_paragraphs(content, max_words, drop_last=truncated)
+                if not trimmed:
+                    break  # A single paragraph is over the limit; only a new generation helps
+                trims += 1
+                self._count_section(section_type, "trims")
+                content = trimmed
+                truncated = False
+                if self.stream_sink is not None:
+                    self.stream_sink.begin(section_type)
+                    self.stream_sink.write(section_type, content)
+            else:
+                if continuations >= max_continuations:
+                    break
+                continuations += 1
+                self._count_section(section_type, "continuations")
+                more, failure = self._continue_section(section_type, model, messages, temperature,
+                                                       content, span, cancel_event)
+                if more:
+                    content = f"{content.rstrip()}\n\n{more}"
+                if failure is not None and failure != "too_long":
+                    break
+                truncated = failure == "too_long"
+                if truncated:
+                    continue
+            failure = self._validation_failure(content, section_type)
         
-        return self._create_fallback_section(section_type, refined_topic)
+        if trims or continuations:
+            span["trims"] = trims
+            span["continuations"] = continuations
+        return content, failure
+    
+    def _continue_section(self, section_type: str, model: str, messages: List[Dict[str, str]],
+                          temperature: float, content: str, span: Dict[str, Any],
+                          cancel_event: Optional[threading.Event] = None) -> Tuple[str, Optional[str]]:
+        """Ask for the rest of a section that came back short, reusing the original prompt as prefix"""
+        words = len(content.split())
+        target_words = self.config.get(f"generation.target_word_counts.{section_type}", 500)
+        min_words = self.config.get("quality.min_section_words", 100)
+        missing = max(target_words - words, min_words - words, 50)
+        section_name = section_type.replace("_", " ")
+        followup = messages + [
+            {"role": "assistant", "content": content},
+            {"role": "user", "content": (
+                f"The {section_name} is too short. Continue it with about {missing} more words in new "
+                f"paragraphs. Do not repeat or summarise what is already written; reply with the continuation only."
+            )}
+        ]
+        return self._complete(section_type, model, followup, temperature, self._completion_tokens(missing),
+                              span, cancel_event, prefix=content)
+    
+    @staticmethod
+    def _trim_to_paragraphs(content: str, max_words: int, drop_last: bool = False) -> str:
+        """Keep whole leading paragraphs up to max_words"""
+        paragraphs = [p for p in re.split(r'\n\s*\n', content.strip()) if p.strip()]
+        if drop_last:
+            paragraphs = paragraphs[:-1]
+        kept = []
+        words = 0
+        for paragraph in paragraphs:
+            count = len(paragraph.split())
+            if words + count > max_words:
+                break
+            kept.append(paragraph)
+            words += count
+        # A heading whose body was cut off goes too
+        while kept and kept[-1].lstrip().startswith("#"):
+            kept.pop()
+        return "\n\n".join(kept)
+    
+    def _count_section(self, section_type: str, key: str, amount: int = 1):
+        with self._stats_lock:
+            stats = self.section_stats.setdefault(section_type, {})
+            stats[key] = stats.get(key, 0) + amount
+    
+    def _set_outcome(self, section_type: str, outcome: str):
+        with self._stats_lock:
+            self.section_stats.setdefault(section_type, {})["outcome"] = outcome
+    
+    def get_section_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Report what each section cost: attempts, generations, repairs and tokens"""
+        with self._stats_lock:
+            return {section_type: dict(stats) for section_type, stats in self.section_stats.items()}
+    
+    def _record_usage(self, usage: Optional[LLMUsage], span: Dict[str, Any], section_type: Optional[str] = None):
+        """Accumulate token usage, including prompt tokens served from the provider's prefix cache"""
+        if usage is None:
+            return
+        prompt_tokens, cached, completion_tokens = usage.prompt_tokens, usage.cached_tokens, usage.completion_tokens
+        with self._stats_lock:
+            self.usage_stats["requests"] += 1
+            self.usage_stats["prompt_tokens"] += prompt_tokens
+            self.usage_stats["cached_tokens"] += cached
+            self.usage_stats["completion_tokens"] += completion_tokens
+            if section_type is not None:
+                stats = self.section_stats.setdefault(section_type, {})
+                stats["prompt_tokens"] = stats.get("prompt_tokens", 0) + prompt_tokens
+                stats["cached_tokens"] = stats.get("cached_tokens", 0) + cached
+                stats["completion_tokens"] = stats.get("completion_tokens", 0) + completion_tokens
+        span["prompt_tokens"] = span.get("prompt_tokens", 0) + prompt_tokens
+        span["cached_tokens"] = span.get("cached_tokens", 0) + cached
+    
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """Report API token usage for this generator"""
+        with self._stats_lock:
+            stats = dict(self.usage_stats)
+        stats["cached_ratio"] = round(stats["cached_tokens"] / stats["prompt_tokens"], 3) if stats["prompt_tokens"] else 0.0
+        first_token_seconds = stats.pop("first_token_seconds")
+        stats["avg_first_token_ms"] = round(first_token_seconds / stats["streams"] * 1000, 1) if stats["streams"] else 0.0
+        stats["prompt_layout"] = self.config.get("generation.prompt_layout", "shared_prefix")
+        stats["provider"] = self.provider.name
+        return stats
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Report completion cache usage for this generator"""
+        with self._stats_lock:
+            hits, misses = self.cache_stats["hits"], self.cache_stats["misses"]
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "read_only": self.response_cache.read_only
+        }
     
     def _validate_content(self, content: str, section_type: str) -> bool:
         """Validate generated content quality"""
+        return self._validation_failure(content, section_type) is None
+    
+    def _validation_failure(self, content: str, section_type: str) -> Optional[str]:
+        """Why content fails validation ("empty", "too_short", "too_long", "placeholder"), or None"""
         if not content or len(content.strip()) < 50:
-            return False
+            return "empty"
+        
+        # Check for placeholder text first: no trim or continuation can repair it
+        content_lower = content.lower()
+        if any(placeholder.lower() in content_lower for placeholder in self.PLACEHOLDERS):
+            return "placeholder"
         
         word_count = len(content.split())
         min_words = self.config.get("quality.min_section_words", 100)
@@ -1012,15 +3356,9 @@ class ArticleGenerator:
         
         if word_count < min_words or word_count > max_words:
             logger.warning(f"{section_type} word count ({word_count}) outside acceptable range")
-            return False
-        
-        # Check for placeholder text
-        placeholders = ["[insert", "TODO", "placeholder", "xxx", "fill in"]
-        content_lower = content.lower()
-        if any(placeholder in content_lower for placeholder in placeholders):
-            return False
+            return "too_short" if word_count < min_words else "too_long"
         
-        return True
+        return None
     
     def _create_fallback_section(self, section_type: str, refined_topic: Dict[str, str]) -> ArticleSection:
         """Create fallback content when generation fails"""
@@ -1037,52 +3375,24 @@ class ArticleGenerator:
         
         return ArticleSection(
             title=section_type.replace("_", " ").title(),
-            content=content
+            content=content,
+            fallback=True
         )
     
-    def _format_context(self, context: Dict[str, Any], papers: List[ResearchPaper] = None) -> str:
-        """Enhanced context formatting for LLM prompt"""
-        if context.get("error"):
-            return f"Limited research context available. {context.get('error')}"
-        
-        formatted = f"""
-Research Context Summary:
-- Total Papers Analyzed: {context['total_papers']}
-- Citation Statistics: 
-  * Total Citations: {context['citation_summary']['total_citations']}
-  * Average Citations: {context['citation_summary']['avg_citations']:.1f}
-  * Median Citations: {context['citation_summary']['median_citations']:.1f}
-- Time Span: {context['temporal_analysis']['year_range']}
-- Recent Research: {context['temporal_analysis']['recent_papers']} papers from last 3 years
-- Quality Metrics:
-  * Average Quality Score: {context['quality_metrics']['avg_quality_score']:.2f}
-  * High Quality Papers: {context['quality_metrics']['high_quality_papers']}
-
-"""
-        
-        # Add key findings
-        if context.get('key_findings'):
-            formatted += "Key Research Findings:\n"
-            for i, finding in enumerate(context['key_findings'][:15], 1):  # Top 15 findings
-                if isinstance(finding, dict):
-                    formatted += f"{i}. {finding['text']} ({finding['author']}, {finding['year']})\n"
-                else:
-                    formatted += f"{i}. {finding}\n"
-            formatted += "\n"
-        
-        # Add common themes
-        if context.get('common_themes'):
-            formatted += f"Common Themes: {', '.join(context['common_themes'][:5])}\n\n"
-        
-        # Add methodologies
-        if context.get('methodologies'):
-            formatted += f"Common Methodologies: {', '.join(context['methodologies'][:5])}\n\n"
-        
-        # Add recent trends
-        if context.get('recent_trends'):
-            formatted += f"Recent Trends: {', '.join(context['recent_trends'])}\n\n"
-        
-        return formatted
+    def completion_budget(self, section_type: str) -> int:
+        """Completion tokens for a section's target length, capped by max_completion_tokens"""
+        return self._completion_tokens(self.config.get(f"generation.target_word_counts.{section_type}", 500))
+    
+    def _completion_tokens(self, target_words: int) -> int:
+        tokens_per_word = self.config.get("generation.completion_budget.tokens_per_word", 1.4)
+        headroom = self.config.get("generation.completion_budget.headroom", 1.5)
+        overhead = self.config.get("generation.completion_budget.overhead_tokens", 1024)
+        minimum = self.config.get("generation.completion_budget.min_tokens", 512)
+        reasoning_models = self.config.get("generation.completion_budget.reasoning_models", ["gpt-5", "o1", "o3", "o4"])
+        if any(self.model.startswith(prefix) for prefix in reasoning_models):
+            minimum = max(minimum, self.config.get("generation.completion_budget.reasoning_min_tokens", 3500))
+        budget = max(minimum, int(target_words * tokens_per_word * headroom) + overhead)
+        return min(budget, self.config.get("generation.max_completion_tokens", 3500))
     
     def _get_title_prompt(self) -> str:
         return """
@@ -1333,6 +3643,18 @@ class DocumentFormatter:
         self.config = config
         self.output_dir = Path(config.get("output.output_dir", "outputs"))
         self.output_dir.mkdir(exist_ok=True)
+        self._path_lock = threading.Lock()
+    
+    def reserve_path(self, filename: str) -> Path:
+        """Claim a unique output path so concurrent articles never overwrite each other"""
+        filepath = self.output_dir / filename
+        with self._path_lock:
+            counter = 1
+            while filepath.exists():
+                filepath = self.output_dir / f"{Path(filename).stem}_{counter}{Path(filename).suffix}"
+                counter += 1
+            filepath.touch()
+        return filepath
         
     def _setup_document_styles(self, doc):
         
@@ -1347,6 +3669,9 @@ class DocumentFormatter:
     def create_docx(self, title: str, sections: List[ArticleSection], 
                    bibliography: str, keywords: List[str]) -> str:
         """Create enhanced APA7 formatted Word document"""
+        from docx import Document
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        
         doc = Document()
         
         # Configure document styles
@@ -1404,7 +3729,7 @@ class DocumentFormatter:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         safe_title = re.sub(r'[^\w\s-]', '', title)[:30].replace(' ', '_')
         filename = f"{safe_title}_{timestamp}.docx"
-        filepath = self.output_dir / filename
+        filepath = self.reserve_path(filename)
         
         try:
             doc.save(str(filepath))
@@ -1465,7 +3790,7 @@ class DocumentFormatter:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         safe_title = re.sub(r'[^\w\s-]', '', title)[:30].replace(' ', '_')
         filename = f"{safe_title}_{timestamp}.md"
-        filepath = self.output_dir / filename
+        filepath = self.reserve_path(filename)
         
         try:
             with open(filepath, 'w', encoding='utf-8') as f:
@@ -1477,118 +3802,281 @@ class DocumentFormatter:
             logger.error(f"Error saving Markdown: {e} (line {sys.exc_info()[2].tb_lineno})")
             # Try with simpler filename
             filename = f"research_article_{timestamp}.md"
-            filepath = self.output_dir / filename
+            filepath = self.reserve_path(filename)
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write('\n'.join(content))
             return str(filepath)
 
+class UnknownRunError(LookupError):
+    """A run ID with no checkpoint to resume"""
+
+class RunCheckpoint:
+    """Persists each stage of an article run under runs/<run_id>/ so a crashed run can resume"""
+    
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.run_id = self.directory.name
+    
+    @classmethod
+    def for_run(cls, config: Config, run_id: str) -> "RunCheckpoint":
+        if not re.fullmatch(r'[\w.-]+', run_id) or run_id.strip(".") == "":
+            raise UnknownRunError(f"Invalid run ID: {run_id!r}")
+        return cls(Path(config.get("checkpoint.dir", "runs")) / run_id)
+    
+    @staticmethod
+    def new_run_id() -> str:
+        return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    
+    @staticmethod
+    def batch_run_id(batch_path: str, index: int, topic: str) -> str:
+        """Stable ID for a batch item, so --batch-resume can find it again"""
+        raw = json.dumps([str(Path(batch_path).resolve()), index, topic])
+        return f"batch_{hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]}"
+    
+    @property
+    def exists(self) -> bool:
+        return (self.directory / "run.json").exists()
+    
+    def discard(self):
+        """Delete an earlier run's checkpoints so this one starts from scratch"""
+        import shutil
+        
+        if self.directory.is_dir():
+            shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def start(self, topic: str):
+        """Record the run's topic, keeping the original record when resuming"""
+        if not self.exists:
+            self._write("run.json", {"run_id": self.run_id, "topic": topic, "created": time.time()})
+    
+    def topic(self) -> Optional[str]:
+        run = self._read("run.json")
+        return run["topic"] if run else None
+    
+    def load(self, stage: str) -> Optional[Any]:
+        """Return a completed stage's output, or None when it has to run"""
+        return self._read(f"{stage}.json")
+    
+    def save(self, stage: str, value: Any):
+        self._write(f"{stage}.json", value)
+    
+    def load_papers(self) -> Optional[List[ResearchPaper]]:
+        records = self.load("papers")
+        return None if records is None else [ResearchPaper(**record) for record in records]
+    
+    def save_papers(self, papers: List[ResearchPaper]):
+        self.save("papers", [asdict(paper) for paper in papers])
+    
+    def load_sections(self) -> Dict[str, ArticleSection]:
+        sections = {}
+        section_dir = self.directory / "sections"
+        if section_dir.is_dir():
+            for path in sorted(section_dir.glob("*.json")):
+                record = self._read(f"sections/{path.name}")
+                if record is not None:
+                    sections[path.stem] = ArticleSection(**record)
+        return sections
+    
+    def save_section(self, section_type: str, section: ArticleSection):
+        # Fallback text is not worth keeping; a resumed run tries the section again
+        if not section.fallback:
+            self._write(f"sections/{section_type}.json", asdict(section))
+    
+    @staticmethod
+    def _encode(value: Any) -> Any:
+        # The context refers to papers directly (citation_summary.most_cited)
+        if isinstance(value, ResearchPaper):
+            return {"__paper__": asdict(value)}
+        return str(value)
+    
+    @staticmethod
+    def _decode(record: Dict[str, Any]) -> Any:
+        return ResearchPaper(**record["__paper__"]) if "__paper__" in record else record
+    
+    def _read(self, name: str) -> Optional[Any]:
+        path = self.directory / name
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f, object_hook=self._decode)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return None
+    
+    def _write(self, name: str, value: Any):
+        """Write via a temporary file and rename, so a crash never leaves a partial checkpoint"""
+        path = self.directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f, default=self._encode)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write checkpoint {path}: {e}")
+            temp_path.unlink(missing_ok=True)
+
 class ResearchArticleGenerator:
     """Enhanced main orchestrator class with better error handling"""
     
-    def __init__(self, config_path: str = "config.yaml"):
-        self.config = Config(config_path)
-        self.searcher = PaperSearcher(self.config)
-        self.extractor = ContentExtractor()
-        self.generator = ArticleGenerator(self.config)
+    def __init__(self, config_path: str = "config.yaml", shared: Optional["ResearchArticleGenerator"] = None,
+                 provider: Optional[str] = None):
+        if shared is not None:
+            # Per-article state is fresh; caches, connection pools and the segmenter are reused
+            self.config = shared.config
+            self.searcher = PaperSearcher(self.config, cache=shared.searcher.cache, http=shared.searcher.http,
+                                          corpus=shared.searcher.corpus)
+            self.extractor = copy.copy(shared.extractor)  # Shallow: segmenter and caches stay shared
+            self.generator = ArticleGenerator(self.config, response_cache=shared.generator.response_cache,
+                                              provider=shared.generator.provider)
+            self.formatter = copy.copy(shared.formatter)
+        else:
+            self.config = Config(config_path, provider=provider)
+            self.searcher = PaperSearcher(self.config)
+            self.extractor = ContentExtractor(self.config)
+            self.generator = ArticleGenerator(self.config)
+            self.formatter = DocumentFormatter(self.config)
         self.citation_manager = CitationManager()
-        self.formatter = DocumentFormatter(self.config)
         
         # Validate setup
         self._validate_setup()
     
+    def spawn(self) -> "ResearchArticleGenerator":
+        """Create a generator for another article that shares this one's warm resources"""
+        return ResearchArticleGenerator(shared=self)
+    
     def _validate_setup(self):
         """Validate that the generator is properly set up"""
-        if not self.config.get("apis.openai_api_key"):
+        if self.generator.provider.requires_api_key and not self.config.get("apis.openai_api_key"):
             logger.error("OpenAI API key is required for article generation")
             raise ValueError("OpenAI API key not found. Please set OPENAI_API_KEY environment variable.")
     
-    def generate_article(self, topic: str) -> Dict[str, Any]:
+    def generate_article(self, topic: Optional[str] = None, run_id: Optional[str] = None) -> Dict[str, Any]:
         """Enhanced main method to generate complete research article"""
         start_time = time.time()
+        tracer = self._start_trace()
+        checkpoint = self._open_checkpoint(run_id, topic)
+        if checkpoint is not None:
+            topic = topic or checkpoint.topic()
+            if not topic:
+                raise UnknownRunError(f"Run {run_id} has no checkpoint to resume")
+            finished = checkpoint.load("result")
+            if finished is not None:
+                logger.info(f"Run {checkpoint.run_id} already finished; returning its result")
+                return finished
+            checkpoint.start(topic)
         logger.info(f"Starting research article generation for topic: '{topic}'")
         try:
             # Step 1: Refine topic
             logger.info("Step 1: Refining research topic...")
-            refined_topic = TopicRefiner.refine_topic(topic)
+            refined_topic = checkpoint.load("refined_topic") if checkpoint else None
+            if refined_topic is None:
+                with tracer.span("refine_topic"):
+                    refined_topic = TopicRefiner.refine_topic(topic)
+                if checkpoint:
+                    checkpoint.save("refined_topic", refined_topic)
             logger.info(f"Refined title: {refined_topic['title']}")
             logger.info(f"Research question: {refined_topic['research_question']}")
+            self.generator.stream_sink = self._partial_writer(refined_topic["title"])
             # Step 2: Search for papers
             logger.info("Step 2: Searching for relevant papers...")
-            search_query = " ".join(refined_topic['search_terms'])
-            papers = self.searcher.search_all_sources(search_query)
-            # Enhanced fallback handling
-            if not papers:
-                logger.warning("No papers found with primary search terms")
-                # Try with broader terms
-                broader_query = " ".join(refined_topic['search_terms'][:3])
-                logger.info(f"Attempting broader search: '{broader_query}'")
-                papers = self.searcher.search_all_sources(broader_query)
+            papers = checkpoint.load_papers() if checkpoint else None
+            if papers is None:
+                search_query = " ".join(refined_topic['search_terms'])
+                corpus_query = " ".join(TopicRefiner.topic_terms(refined_topic['original_topic']))
+                with tracer.span("search", query=search_query):
+                    papers = self.searcher.search_all_sources(search_query, corpus_query)
+                # Enhanced fallback handling
+                if not papers:
+                    logger.warning("No papers found with primary search terms")
+                    # Try with broader terms
+                    broader_query = " ".join(refined_topic['search_terms'][:3])
+                    logger.info(f"Attempting broader search: '{broader_query}'")
+                    with tracer.span("search", query=broader_query):
+                        papers = self.searcher.search_all_sources(broader_query, corpus_query)
+                if checkpoint:
+                    checkpoint.save_papers(papers)
+            else:
+                logger.info(f"Resuming with {len(papers)} checkpointed papers")
             if not papers:
                 logger.warning("Still no papers found. Generating article with limited context...")
-                return self._generate_limited_article(refined_topic)
+                return self._finish_run(checkpoint, self._generate_limited_article(refined_topic))
             logger.info(f"Using {len(papers)} papers for article generation")
             # Add papers to citation manager
             for paper in papers:
                 self.citation_manager.add_reference(paper)
             # Step 3: Extract knowledge context
             logger.info("Step 3: Extracting knowledge context...")
-            context = self.extractor.build_knowledge_context(papers)
+            context = checkpoint.load("context") if checkpoint else None
+            if context is None:
+                with tracer.span("knowledge_context", papers=len(papers)):
+                    context = self.extractor.build_knowledge_context(papers)
+                if checkpoint:
+                    checkpoint.save_papers(papers)  # Now carrying their key findings
+                    checkpoint.save("context", context)
             # Step 4: Generate article sections
             logger.info("Step 4: Generating article sections...")
-            sections = []
             section_types = ["abstract", "introduction", "literature_review", "method", "results", "conclusion"]
-            for section_type in tqdm(section_types, desc="Generating sections"):
-                logger.info(f"Generating {section_type}...")
-                try:
-                    section = self.generator.generate_section(section_type, context, refined_topic, papers)
-                    sections.append(section)
-                    logger.info(f"Successfully generated {section_type} ({section.word_count} words)")
-                except Exception as e:
-                    import sys
-                    logger.error(f"Failed to generate {section_type}: {e} (line {sys.exc_info()[2].tb_lineno})")
-                    # Create fallback section
-                    fallback_section = self.generator._create_fallback_section(section_type, refined_topic)
-                    sections.append(fallback_section)
+            completed = checkpoint.load_sections() if checkpoint else {}
+            if completed:
+                logger.info(f"Resuming with checkpointed sections: {', '.join(completed)}")
+            with tracer.span("sections", count=len(section_types), resumed=len(completed)):
+                sections = self.generator.generate_sections(section_types, context, refined_topic, papers,
+                                                            completed=completed,
+                                                            on_section=checkpoint.save_section if checkpoint else None)
             # Step 5: Generate bibliography
             logger.info("Step 5: Generating bibliography...")
-            bibliography = self.citation_manager.generate_bibliography()
+            with tracer.span("bibliography"):
+                bibliography = self.citation_manager.generate_bibliography()
             # Step 6: Generate keywords
             logger.info("Step 6: Generating keywords...")
-            keywords = self._generate_keywords(refined_topic, context)
+            with tracer.span("keywords"):
+                keywords = self._generate_keywords(refined_topic, context)
             # Step 7: Format and save documents
             logger.info("Step 7: Creating output documents...")
             output_files = {}
             # Create Word document
             if "docx" in self.config.get("output.format", ["docx"]):
                 try:
-                    docx_path = self.formatter.create_docx(
-                        refined_topic["title"], sections, bibliography, keywords
-                    )
+                    with tracer.span("format.docx"):
+                        docx_path = self.formatter.create_docx(
+                            refined_topic["title"], sections, bibliography, keywords
+                        )
                     output_files["docx"] = docx_path
                 except Exception as e:
                     logger.error(f"Failed to create Word document: {e}")
             # Create Markdown document
             if "markdown" in self.config.get("output.format", ["docx"]):
                 try:
-                    md_path = self.formatter.create_markdown(
-                        refined_topic["title"], sections, bibliography, keywords, context
-                    )
+                    with tracer.span("format.markdown"):
+                        md_path = self.formatter.create_markdown(
+                            refined_topic["title"], sections, bibliography, keywords, context
+                        )
                     output_files["markdown"] = md_path
                 except Exception as e:
                     logger.error(f"Failed to create Markdown document: {e}")
             # Create summary report
             if self.config.get("output.include_summary", True):
                 try:
-                    summary_path = self._create_summary_report(refined_topic, context, sections, papers)
+                    with tracer.span("format.summary"):
+                        summary_path = self._create_summary_report(refined_topic, context, sections, papers)
                     output_files["summary"] = summary_path
                 except Exception as e:
                     logger.error(f"Failed to create summary report: {e}")
+            # Export trace
+            trace_path = self._export_trace(tracer, refined_topic["title"])
+            if trace_path:
+                output_files["trace"] = trace_path
             # Calculate generation time
             generation_time = time.time() - start_time
             # Compile results
             result = {
                 "status": "success",
                 "title": refined_topic["title"],
+                "run_id": checkpoint.run_id if checkpoint else "",
                 "files": output_files,
                 "stats": {
                     "papers_analyzed": len(papers),
@@ -1597,20 +4085,77 @@ class ResearchArticleGenerator:
                     "references": len(self.citation_manager.references),
                     "generation_time_minutes": round(generation_time / 60, 2),
                     "search_stats": self.searcher.search_stats,
-                    "quality_metrics": self._calculate_quality_metrics(sections, context)
+                    "llm_cache": self.generator.get_cache_stats(),
+                    "llm_usage": self.generator.get_usage_stats(),
+                    "llm_sections": self.generator.get_section_stats(),
+                    "quality_metrics": self._calculate_quality_metrics(sections, context),
+                    "trace": tracer.summary()
                 },
                 "warnings": self._collect_warnings()
             }
             logger.info(f"Article generation completed successfully in {generation_time/60:.2f} minutes!")
-            return result
+            return self._finish_run(checkpoint, result)
         except Exception as e:
             logger.error(f"Article generation failed: {e}")
             return {
                 "status": "error",
                 "error": str(e),
                 "title": refined_topic.get("title", topic) if 'refined_topic' in locals() else topic,
+                "run_id": checkpoint.run_id if checkpoint else "",
                 "generation_time_minutes": round((time.time() - start_time) / 60, 2)
             }
+        finally:
+            if self.generator.stream_sink is not None:
+                self.generator.stream_sink.finish()
+                self.generator.stream_sink = None
+    
+    def _open_checkpoint(self, run_id: Optional[str], topic: Optional[str]) -> Optional[RunCheckpoint]:
+        """Checkpoint for this run: the given run ID to resume, a fresh one otherwise"""
+        if not self.config.get("checkpoint.enabled", True):
+            if run_id and not topic:
+                raise ValueError("Resuming a run requires checkpoint.enabled")
+            return None
+        return RunCheckpoint.for_run(self.config, run_id or RunCheckpoint.new_run_id())
+    
+    @staticmethod
+    def _finish_run(checkpoint: Optional[RunCheckpoint], result: Dict[str, Any]) -> Dict[str, Any]:
+        """Mark the run complete; resuming it later returns this result"""
+        if checkpoint is not None:
+            result.setdefault("run_id", checkpoint.run_id)
+            checkpoint.save("result", result)
+        return result
+    
+    def _partial_writer(self, title: str) -> Optional[PartialSectionWriter]:
+        """Directory that receives this article's sections while they stream"""
+        if not (self.config.get("generation.streaming.enabled", True)
+                and self.config.get("generation.streaming.write_partial", True)):
+            return None
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        safe_title = re.sub(r'[^\w\s-]', '', title)[:30].replace(' ', '_')
+        name = f"{safe_title}_{timestamp}_{uuid.uuid4().hex[:6]}"  # Concurrent articles may share a title
+        return PartialSectionWriter(self.formatter.output_dir / "partial" / name)
+    
+    def _start_trace(self) -> Tracer:
+        """Create this run's tracer and hand it to every component"""
+        tracer = Tracer(enabled=self.config.get("tracing.enabled", True))
+        for component in (self.searcher, self.extractor, self.generator):
+            component.tracer = tracer
+        return tracer
+    
+    def _export_trace(self, tracer: Tracer, title: str) -> str:
+        """Write a Chrome trace for the run if an export directory is configured"""
+        export_dir = self.config.get("tracing.export_dir", "")
+        if not export_dir or not tracer.enabled:
+            return ""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        safe_title = re.sub(r'[^\w\s-]', '', title)[:30].replace(' ', '_')
+        try:
+            path = tracer.export_chrome_trace(str(Path(export_dir) / f"trace_{safe_title}_{timestamp}_{uuid.uuid4().hex[:6]}.json"))
+            logger.info(f"Trace saved: {path}")
+            return path
+        except Exception as e:
+            logger.warning(f"Could not export trace: {e}")
+            return ""
     
     def _generate_limited_article(self, refined_topic: Dict[str, str]) -> Dict[str, Any]:
         """Generate article with limited context when no papers are found"""
@@ -1670,6 +4215,7 @@ class ResearchArticleGenerator:
         # Calculate readability
         all_text = " ".join([s.content for s in sections])
         try:
+            from textstat import flesch_reading_ease
             readability_score = flesch_reading_ease(all_text)
         except:
             readability_score = 0
@@ -1691,8 +4237,10 @@ class ResearchArticleGenerator:
             warnings.append("Low number of papers found - consider broader search terms")
         
         # Check for API key warnings
-        if not self.config.get("apis.openai_api_key"):
+        if self.generator.provider.requires_api_key and not self.config.get("apis.openai_api_key"):
             warnings.append("OpenAI API key not configured")
+        if self.generator.provider.name == "stub":
+            warnings.append("Sections were written by the offline stub provider")
         
         return warnings
     
@@ -1734,7 +4282,8 @@ class ResearchArticleGenerator:
         """Create enhanced summary report"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"generation_report_{timestamp}.md"
-        filepath = self.formatter.output_dir / filename
+        filepath = self.formatter.reserve_path(filename)
+        filename = filepath.name
         
         report_content = f"""# Research Article Generation Report
 
@@ -1901,6 +4450,369 @@ class ResearchArticleGenerator:
             logger.error(f"Failed to create summary report: {e} (line {sys.exc_info()[2].tb_lineno})")
             return ""
 
+class BatchRunner:
+    """Generates articles for many topics on a bounded worker pool with shared resources"""
+    
+    def __init__(self, generator: ResearchArticleGenerator, workers: int = 2, batch_path: str = "",
+                 resume: bool = False):
+        self.generator = generator
+        self.workers = max(1, workers)
+        self.batch_path = batch_path  # Run IDs derive from it, so a crashed batch can be resumed
+        self.resume = resume  # Reuse checkpoints of an earlier run of this batch instead of starting over
+        self._manifest_lock = threading.Lock()
+    
+    @staticmethod
+    def load_topics(path: str) -> List[Dict[str, Any]]:
+        """Read topics from a JSONL or CSV file"""
+        topics = []
+        file_path = Path(path)
+        
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            if file_path.suffix.lower() == ".csv":
+                reader = csv.DictReader(f)
+                topic_field = "topic" if "topic" in (reader.fieldnames or []) else (reader.fieldnames or [None])[0]
+                for row in reader:
+                    topic = (row.get(topic_field) or "").strip() if topic_field else ""
+                    if topic:
+                        topics.append({**row, "topic": topic})
+            else:
+                for line_number, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"Skipping invalid JSON on line {line_number} of {path}: {e}")
+                        continue
+                    if isinstance(entry, str):
+                        entry = {"topic": entry}
+                    if isinstance(entry, dict) and str(entry.get("topic", "")).strip():
+                        entry["topic"] = str(entry["topic"]).strip()
+                        topics.append(entry)
+                    else:
+                        logger.warning(f"Skipping line {line_number} of {path}: no topic")
+        
+        logger.info(f"Loaded {len(topics)} topics from {path}")
+        return topics
+    
+    def run(self, topics: List[Dict[str, Any]], manifest_path: str) -> Dict[str, int]:
+        """Generate every topic and stream one manifest line per finished article"""
+        from tqdm import tqdm
+        
+        counts = {"success": 0, "limited_success": 0, "error": 0}
+        Path(manifest_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(manifest_path, 'a', encoding='utf-8') as manifest, \
+                ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="article") as executor:
+            futures = {executor.submit(self._run_one, index, entry): entry
+                       for index, entry in enumerate(topics)}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Generating articles"):
+                record = future.result()
+                counts[record["status"]] = counts.get(record["status"], 0) + 1
+                with self._manifest_lock:
+                    manifest.write(json.dumps(record, default=str) + "\n")
+                    manifest.flush()
+        
+        logger.info(f"Batch complete: {counts}")
+        return counts
+    
+    def _run_one(self, index: int, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate a single article and summarize it for the manifest"""
+        started = time.time()
+        topic = entry["topic"]
+        run_id = RunCheckpoint.batch_run_id(self.batch_path, index, topic)
+        try:
+            if not self.resume:
+                RunCheckpoint.for_run(self.generator.config, run_id).discard()
+            result = self.generator.spawn().generate_article(topic, run_id=run_id)
+        except Exception as e:
+            logger.error(f"Batch item {index} ('{topic}') failed: {e}")
+            result = {"status": "error", "error": str(e)}
+        
+        return {
+            "index": index,
+            "topic": topic,
+            "input": {k: v for k, v in entry.items() if k != "topic"},
+            "status": result.get("status", "error"),
+            "run_id": run_id,
+            "title": result.get("title", ""),
+            "files": result.get("files", {}),
+            "stats": result.get("stats", {}),
+            "warnings": result.get("warnings", []),
+            "error": result.get("error", ""),
+            "seconds": round(time.time() - started, 2)
+        }
+
+class JobQueue:
+    """Persistent SQLite-backed queue of article generation jobs"""
+    
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, topic TEXT NOT NULL, status TEXT NOT NULL, "
+            "created REAL NOT NULL, started REAL, finished REAL, result TEXT, error TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created)")
+        # Jobs interrupted by a restart go back to the queue
+        requeued = self._conn.execute(
+            "UPDATE jobs SET status = 'queued', started = NULL WHERE status = 'running'"
+        ).rowcount
+        if requeued:
+            logger.info(f"Re-queued {requeued} interrupted jobs")
+    
+    def submit(self, topic: str) -> str:
+        """Add a job and wake an idle worker"""
+        job_id = uuid.uuid4().hex
+        with self._available:
+            self._conn.execute(
+                "INSERT INTO jobs (id, topic, status, created) VALUES (?, ?, 'queued', ?)",
+                (job_id, topic, time.time())
+            )
+            self._available.notify()
+        return job_id
+    
+    def claim(self, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+        """Take the oldest queued job, waiting up to timeout for one to arrive"""
+        with self._available:
+            row = self._next_queued()
+            if row is None:
+                self._available.wait(timeout)
+                row = self._next_queued()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE jobs SET status = 'running', started = ? WHERE id = ?",
+                               (time.time(), row["id"]))
+            return {"id": row["id"], "topic": row["topic"]}
+    
+    def _next_queued(self) -> Optional[sqlite3.Row]:
+        return self._conn.execute(
+            "SELECT id, topic FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+        ).fetchone()
+    
+    def finish(self, job_id: str, result: Dict[str, Any]):
+        """Record a job's result; generation errors are stored as failed jobs"""
+        status = "failed" if result.get("status") == "error" else "done"
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished = ?, result = ?, error = ? WHERE id = ?",
+                (status, time.time(), json.dumps(result, default=str), result.get("error", ""), job_id)
+            )
+    
+    def get(self, job_id: str, include_result: bool = False) -> Optional[Dict[str, Any]]:
+        """Return a job's status record, optionally with its result"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {key: row[key] for key in ("id", "topic", "status", "created", "started", "finished", "error")}
+        if include_result:
+            job["result"] = json.loads(row["result"]) if row["result"] else None
+        return job
+    
+    def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Return the most recent jobs"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, topic, status, created, finished FROM jobs ORDER BY created DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def counts(self) -> Dict[str, int]:
+        """Count jobs by status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+class ArticleService:
+    """Long-running HTTP service that generates queued articles on warm workers"""
+    
+    def __init__(self, generator: ResearchArticleGenerator, queue: JobQueue, workers: int = 2):
+        self.generator = generator
+        self.queue = queue
+        self.workers = max(1, workers)
+        self._stop = threading.Event()
+        self._threads = []
+    
+    def start(self):
+        """Start the worker threads"""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"service-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def stop(self):
+        """Ask workers to exit once their current job is done"""
+        self._stop.set()
+    
+    def _work(self):
+        while not self._stop.is_set():
+            job = self.queue.claim(timeout=1.0)
+            if job is None:
+                continue
+            logger.info(f"Job {job['id']} started: '{job['topic']}'")
+            try:
+                # A job re-queued after a restart resumes from its checkpoint
+                result = self.generator.spawn().generate_article(job["topic"], run_id=job["id"])
+            except Exception as e:
+                logger.error(f"Job {job['id']} failed: {e}")
+                result = {"status": "error", "error": str(e)}
+            self.queue.finish(job["id"], result)
+            logger.info(f"Job {job['id']} finished with status {result.get('status')}")
+    
+    def serve(self, host: str, port: int):
+        """Run the HTTP API until interrupted"""
+        from http.server import ThreadingHTTPServer
+        
+        server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.start()
+        logger.info(f"Article service listening on http://{host}:{port} with {self.workers} workers")
+        try:
+            server.serve_forever()
+        finally:
+            self.stop()
+            server.server_close()
+    
+    def _make_handler(self):
+        from http.server import BaseHTTPRequestHandler
+        
+        service = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status: int, body: Dict[str, Any]):
+                payload = json.dumps(body, default=str).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def do_GET(self):
+                parts = [p for p in self.path.split("?")[0].split("/") if p]
+                if parts == ["health"]:
+                    return self._send(200, {"status": "ok", "workers": service.workers,
+                                            "jobs": service.queue.counts()})
+                if parts == ["jobs"]:
+                    return self._send(200, {"jobs": service.queue.list()})
+                if len(parts) in (2, 3) and parts[0] == "jobs":
+                    want_result = len(parts) == 3
+                    if want_result and parts[2] != "result":
+                        return self._send(404, {"error": "not found"})
+                    job = service.queue.get(parts[1], include_result=want_result)
+                    if job is None:
+                        return self._send(404, {"error": f"unknown job {parts[1]}"})
+                    if want_result and job["status"] not in ("done", "failed"):
+                        return self._send(409, {"error": "job not finished", "status": job["status"]})
+                    return self._send(200, job)
+                return self._send(404, {"error": "not found"})
+            
+            def do_POST(self):
+                if self.path.split("?")[0].rstrip("/") != "/jobs":
+                    return self._send(404, {"error": "not found"})
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                    topic = str(body.get("topic", "")).strip()
+                except (ValueError, AttributeError) as e:
+                    return self._send(400, {"error": f"invalid request body: {e}"})
+                if not topic:
+                    return self._send(400, {"error": "topic is required"})
+                job_id = service.queue.submit(topic)
+                return self._send(202, {"id": job_id, "status": "queued"})
+            
+            def log_message(self, format, *args):
+                logger.debug(f"{self.address_string()} - {format % args}")
+        
+        return Handler
+
+def benchmark_import_time(runs: int = 5) -> Dict[str, Any]:
+    """Measure cold import and --help start-up time in fresh interpreters"""
+    module_path = Path(__file__).resolve()
+    probe = (
+        "import sys, time, json; t = time.perf_counter(); import {m}; "
+        "print(json.dumps({{'ms': (time.perf_counter() - t) * 1000, "
+        "'heavy': [n for n in {m}.HEAVY_MODULES if n in sys.modules]}}))"
+    ).format(m=module_path.stem)
+    
+    import_ms, help_ms, heavy = [], [], set()
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, "-c", probe], cwd=str(module_path.parent),
+                                   capture_output=True, text=True, check=True)
+        sample = json.loads(completed.stdout.strip().splitlines()[-1])
+        import_ms.append(sample["ms"])
+        heavy.update(sample["heavy"])
+        
+        started = time.perf_counter()
+        subprocess.run([sys.executable, str(module_path), "--help"], cwd=str(module_path.parent),
+                       capture_output=True, check=True)
+        help_ms.append((time.perf_counter() - started) * 1000)
+    
+    return {
+        "runs": runs,
+        "import_ms": round(statistics.median(import_ms), 1),
+        "help_ms": round(statistics.median(help_ms), 1),
+        "heavy_modules_loaded": sorted(heavy)
+    }
+
+def benchmark_segmenters(fixtures_path: str, repeats: int = 20) -> Dict[str, Any]:
+    """Compare segmenter throughput, accuracy and agreement with punkt on a JSONL file of abstracts
+    
+    Fixtures with a "sentences" list are scored against that expected split.
+    """
+    with open(fixtures_path, "r", encoding="utf-8") as f:
+        fixtures = [json.loads(line) for line in f if line.strip()]
+    abstracts = [fixture["abstract"] for fixture in fixtures]
+    labelled = [(i, fixture["sentences"]) for i, fixture in enumerate(fixtures) if "sentences" in fixture]
+    
+    def boundaries(text: str, sentences: List[str]) -> set:
+        offsets, position = set(), 0
+        for sentence in sentences:
+            position = text.find(sentence, position) + len(sentence)
+            offsets.add(position)
+        return offsets
+    
+    report = {"abstracts": len(abstracts), "repeats": repeats, "segmenters": {}}
+    outputs = {}
+    for name in ("rules", "punkt"):
+        segmenter = SentenceSegmenter.create(name)
+        try:
+            outputs[name] = [segmenter.split(a) for a in abstracts]  # Warm-up and loading
+        except Exception as e:
+            report["segmenters"][name] = {"error": " ".join(str(e).split())[:200]}
+            continue
+        started = time.perf_counter()
+        for _ in range(repeats):
+            for abstract in abstracts:
+                segmenter.split(abstract)
+        elapsed = time.perf_counter() - started
+        report["segmenters"][name] = {
+            "abstracts_per_second": round(len(abstracts) * repeats / elapsed, 1),
+            "sentences": sum(len(s) for s in outputs[name])
+        }
+        if labelled:
+            correct = sum(outputs[name][i] == expected for i, expected in labelled)
+            report["segmenters"][name]["labelled_correct"] = f"{correct}/{len(labelled)}"
+    
+    if "rules" in outputs and "punkt" in outputs:
+        exact = sum(r == p for r, p in zip(outputs["rules"], outputs["punkt"]))
+        shared = predicted = reference = 0
+        for abstract, rules, punkt in zip(abstracts, outputs["rules"], outputs["punkt"]):
+            rule_bounds, punkt_bounds = boundaries(abstract, rules), boundaries(abstract, punkt)
+            shared += len(rule_bounds & punkt_bounds)
+            predicted += len(rule_bounds)
+            reference += len(punkt_bounds)
+        report["agreement"] = {
+            "identical_abstracts": round(exact / max(len(abstracts), 1), 3),
+            "boundary_f1": round(2 * shared / max(predicted + reference, 1), 3)
+        }
+    return report
+
 def main():
     """Enhanced CLI interface with better error handling and options"""
     parser = argparse.ArgumentParser(
@@ -1911,10 +4823,26 @@ Examples:
   python articlegen.py "machine learning in healthcare"
   python articlegen.py "climate change impact" --config custom_config.yaml
   python articlegen.py "social media effects" --output ./my_articles --verbose
+  python articlegen.py --batch topics.jsonl --workers 4
+  python articlegen.py --serve --port 8080
         """
     )
     
-    parser.add_argument("topic", help="Research topic to generate article for")
+    parser.add_argument("topic", nargs="?", help="Research topic to generate article for")
+    parser.add_argument("--batch", metavar="FILE", help="Generate articles for every topic in a JSONL or CSV file")
+    parser.add_argument("--workers", type=int, help="Articles generated in parallel in batch or service mode")
+    parser.add_argument("--manifest", help="JSONL manifest path for batch results")
+    parser.add_argument("--batch-resume", action="store_true",
+                       help="Resume an interrupted --batch run from its checkpoints instead of starting over")
+    parser.add_argument("--serve", action="store_true", help="Run as a job-queue HTTP service")
+    parser.add_argument("--host", help="Service bind address")
+    parser.add_argument("--port", type=int, help="Service port")
+    parser.add_argument("--benchmark", choices=["import", "segmenter"],
+                       help="Run a performance benchmark instead of generating")
+    parser.add_argument("--budget-ms", type=float, default=150,
+                       help="Fail the import benchmark above this median import time")
+    parser.add_argument("--fixtures", default=str(Path(__file__).resolve().parent / "benchmarks" / "segmenter_abstracts.jsonl"),
+                       help="JSONL file of abstracts for the segmenter benchmark")
     parser.add_argument("--config", default="config.yaml", help="Configuration file path")
     parser.add_argument("--output", default="outputs", help="Output directory")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose logging")
@@ -1922,19 +4850,49 @@ Examples:
                        help="Output format (default: both)")
     parser.add_argument("--max-papers", type=int, help="Maximum number of papers to analyze")
     parser.add_argument("--no-summary", action="store_true", help="Skip generation report")
+    parser.add_argument("--trace-dir", help="Export a Chrome trace of each article run to this directory")
+    parser.add_argument("--cache-read-only", action="store_true",
+                       help="Replay cached completions without storing new ones")
+    parser.add_argument("--corpus", choices=["off", "first", "offline"],
+                       help="Local paper corpus mode (offline never calls remote APIs)")
+    parser.add_argument("--provider", choices=["openai", "stub"],
+                       help="LLM backend (stub writes deterministic text offline, no API key needed)")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                       help="Resume an interrupted run, skipping the stages it completed")
     
     args = parser.parse_args()
     
+    if args.benchmark == "import":
+        report = benchmark_import_time()
+        print(json.dumps(report, indent=2))
+        if report["heavy_modules_loaded"] or report["import_ms"] > args.budget_ms:
+            print(f"❌ Import benchmark regressed (budget {args.budget_ms:.0f} ms, no heavy modules)")
+            sys.exit(1)
+        print("✅ Import benchmark within budget")
+        return
+    
+    if args.benchmark == "segmenter":
+        print(json.dumps(benchmark_segmenters(args.fixtures), indent=2))
+        return
+    
+    if not args.topic and not args.batch and not args.serve and not args.resume:
+        parser.error("a topic, --batch FILE, --serve or --resume RUN_ID is required")
+    
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
         logger.debug("Verbose logging enabled")
     
     logger.info("Starting Enhanced Research Article Generator")
-    logger.info(f"Topic: {args.topic}")
+    if args.topic:
+        logger.info(f"Topic: {args.topic}")
+    elif args.resume:
+        logger.info(f"Resuming run: {args.resume}")
+    elif args.batch:
+        logger.info(f"Batch file: {args.batch}")
     
     try:
         # Initialize generator
-        generator = ResearchArticleGenerator(args.config)
+        generator = ResearchArticleGenerator(args.config, provider=args.provider)
         
         # Update configuration based on CLI args
         if args.output != "outputs":
@@ -1950,13 +4908,49 @@ Examples:
         if args.no_summary:
             generator.config.config["output"]["include_summary"] = False
         
+        if args.cache_read_only:
+            generator.generator.response_cache.read_only = True
+        
+        if args.trace_dir:
+            generator.config.config.setdefault("tracing", {})["export_dir"] = args.trace_dir
+        
+        if args.corpus:
+            generator.config.config["search"].setdefault("corpus", {})["mode"] = args.corpus
+        
+        if args.serve:
+            queue = JobQueue(generator.config.get("service.queue_path", "cache/jobs.sqlite"))
+            workers = args.workers or generator.config.get("service.workers", 2)
+            service = ArticleService(generator, queue, workers)
+            service.serve(args.host or generator.config.get("service.host", "127.0.0.1"),
+                          args.port or generator.config.get("service.port", 8080))
+            return
+        
+        if args.batch:
+            topics = BatchRunner.load_topics(args.batch)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            manifest_path = args.manifest or str(generator.formatter.output_dir / f"batch_manifest_{timestamp}.jsonl")
+            workers = args.workers or generator.config.get("batch.workers", 2)
+            counts = BatchRunner(generator, workers, batch_path=args.batch,
+                                 resume=args.batch_resume).run(topics, manifest_path)
+            
+            print("\n📦 Batch Generation Completed!")
+            print(f"   - Topics: {len(topics)}")
+            for status, count in counts.items():
+                print(f"   - {status}: {count}")
+            print(f"📄 Manifest: {manifest_path}")
+            if counts.get("error"):
+                sys.exit(1)
+            return
+        
         # Generate article
-        result = generator.generate_article(args.topic)
+        result = generator.generate_article(args.topic, run_id=args.resume)
         
         # Handle results
         if result["status"] == "error":
             print(f"❌ Error: {result['error']}")
             print(f"⏱️  Generation time: {result.get('generation_time_minutes', 0):.2f} minutes")
+            if result.get("run_id"):
+                print(f"🔁 Resume with: --resume {result['run_id']}")
             sys.exit(1)
         
         elif result["status"] == "limited_success":
@@ -1972,6 +4966,8 @@ Examples:
             # Successful generation
             print("\n🎉 Article Generation Completed Successfully!")
             print(f"📝 Title: {result['title']}")
+            if result.get("run_id"):
+                print(f"🔁 Run ID: {result['run_id']}")
             print(f"📊 Statistics:")
             print(f"   - Papers analyzed: {result['stats']['papers_analyzed']:,}")
             print(f"   - Total words: {result['stats']['total_words']:,}")
@@ -1986,6 +4982,14 @@ Examples:
                 print(f"   - Research foundation: {qm['research_foundation_strength']:.1f}/10.0")
                 print(f"   - Readability score: {qm['readability_score']:.1f}")
                 print(f"   - Section completeness: {qm['section_completeness']:.1f}%")
+            
+            if 'llm_cache' in result['stats']:
+                lc = result['stats']['llm_cache']
+                print(f"   - LLM cache hit rate: {lc['hit_rate']:.0%} ({lc['hits']} hits, {lc['misses']} misses)")
+            
+            if result['stats'].get('llm_usage', {}).get('prompt_tokens'):
+                lu = result['stats']['llm_usage']
+                print(f"   - Prompt tokens: {lu['prompt_tokens']:,} ({lu['cached_tokens']:,} cached by the provider, {lu['cached_ratio']:.0%})")
         
         # Show generated files
         if result.get("files"):
@@ -2009,6 +5013,8 @@ Examples:
             print(f"\n🔍 Search Statistics:")
             print(f"   - Total papers found: {search_stats.get('total_found', 0)}")
             print(f"   - After filtering: {search_stats.get('after_filtering', 0)}")
+            if search_stats.get('cache'):
+                print(f"   - Cache hits/misses: {search_stats['cache']['hits']}/{search_stats['cache']['misses']}")
             if search_stats.get('by_source'):
                 print(f"   - By source:")
                 for source, count in search_stats['by_source'].items():
@@ -2017,6 +5023,10 @@ Examples:
     except KeyboardInterrupt:
         print("\n⚠️ Generation interrupted by user")
         sys.exit(1)
+    except UnknownRunError as e:
+        print(f"❌ Unknown run: {e}")
+        print("💡 Run IDs are the directory names under the checkpoint directory (checkpoint.dir, default runs/)")
+        sys.exit(1)
     except ValueError as e:
         print(f"❌ Configuration Error: {e}")
         print("💡 Tip: Make sure your OpenAI API key is set in the OPENAI_API_KEY environment variable")
@@ -0,0 +1,89 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import articlegenv3
+from articlegenv3 import (ArticleSection, BatchRunner, Config, ResearchArticleGenerator, ResearchPaper,
+                          RunCheckpoint, UnknownRunError)
+
+
+def make_paper(i):
+    return ResearchPaper(title=f"Protein folding study {i}", authors=["Ada Lovelace"], year=2021,
+                         abstract="We found that structure prediction improved accuracy by 20%. " * 4,
+                         url=f"u{i}", citations=i)
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    searches = []
+
+    def search_all_sources(self, query, corpus_query=None):
+        searches.append(query)
+        return [make_paper(i) for i in range(12)]
+
+    monkeypatch.setattr(articlegenv3.PaperSearcher, "search_all_sources", search_all_sources)
+    g = ResearchArticleGenerator(str(tmp_path / "config.json"), provider="stub")
+    g.config.config["generation"]["stub"]["latency_ms"] = 0
+    g.config.config["output"].update({"format": ["markdown"], "include_summary": False})
+    g.searches = searches
+    return g
+
+
+def test_invalid_run_ids_are_unknown_runs(tmp_path):
+    config = Config(str(tmp_path / "config.json"))
+    for run_id in ("..", ".", "a/b", ""):
+        with pytest.raises(UnknownRunError):
+            RunCheckpoint.for_run(config, run_id)
+    assert issubclass(UnknownRunError, LookupError)
+
+
+def test_stages_round_trip(tmp_path):
+    checkpoint = RunCheckpoint(tmp_path / "run1")
+    checkpoint.start("protein folding")
+    checkpoint.start("another topic")  # Resuming keeps the original record
+    checkpoint.save_papers([make_paper(1)])
+    checkpoint.save_section("abstract", ArticleSection(title="Abstract", content="Text."))
+    checkpoint.save_section("results", ArticleSection(title="Results", content="Fallback.", fallback=True))
+
+    assert checkpoint.topic() == "protein folding"
+    assert checkpoint.load_papers() == [make_paper(1)]
+    assert list(checkpoint.load_sections()) == ["abstract"]  # Fallback text is retried, not kept
+    assert checkpoint.load("context") is None
+
+
+def test_resume_of_unknown_run_raises(generator):
+    with pytest.raises(UnknownRunError):
+        generator.generate_article(run_id="nope")
+
+
+def test_interrupted_run_resumes_missing_stages(generator):
+    first = generator.generate_article("protein folding")
+    assert first["status"] == "success"
+    run_dir = Path("runs") / first["run_id"]
+
+    # Crash before the abstract was checkpointed and before the run finished
+    (run_dir / "result.json").unlink()
+    (run_dir / "sections" / "abstract.json").unlink()
+
+    resumed = generator.spawn()
+    second = resumed.generate_article(run_id=first["run_id"])
+    assert second["status"] == "success"
+    assert len(generator.searches) == 1  # Papers came from the checkpoint
+    assert list(resumed.generator.get_section_stats()) == ["abstract"]
+
+    # A finished run returns its stored result
+    assert generator.spawn().generate_article(run_id=first["run_id"]) == second
+
+
+def test_batch_reruns_start_fresh_unless_resumed(generator, tmp_path):
+    topics_path = tmp_path / "topics.jsonl"
+    topics_path.write_text('{"topic": "protein folding"}\n', encoding="utf-8")
+    topics = BatchRunner.load_topics(str(topics_path))
+
+    for resume, searches in ((False, 1), (False, 2), (True, 2)):
+        BatchRunner(generator, 1, batch_path=str(topics_path), resume=resume).run(topics, "manifest.jsonl")
+        assert len(generator.searches) == searches
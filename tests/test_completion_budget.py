@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from articlegenv3 import ArticleGenerator, Config, StubProvider
+
+
+def make_generator(tmp_path, monkeypatch, model):
+    monkeypatch.chdir(tmp_path)
+    config = Config(str(tmp_path / "config.json"), provider="stub")
+    config.config["generation"]["model"] = model
+    return ArticleGenerator(config, provider=StubProvider(config))
+
+
+def test_reasoning_models_keep_the_flat_limit(tmp_path, monkeypatch):
+    generator = make_generator(tmp_path, monkeypatch, "gpt-5-mini")
+    assert generator.completion_budget("abstract") == 3500
+    assert generator._completion_tokens(50) == 3500  # Continuations reason too
+
+
+def test_other_models_get_budgets_from_target_words(tmp_path, monkeypatch):
+    generator = make_generator(tmp_path, monkeypatch, "gpt-4-turbo")
+    # 250 words * 1.4 tokens/word * 1.5 headroom + 1024 overhead
+    assert generator.completion_budget("abstract") == 1549
+    assert generator.completion_budget("literature_review") == 3124
+    assert generator._completion_tokens(5000) == 3500  # Capped by max_completion_tokens
@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from articlegenv3 import Config, PaperSearcher, ResearchPaper, TopicRefiner
+
+TOPIC = "Protein folding prediction"  # Padding adds 4 terms, so 3 of 7 terms would not reach 0.5 coverage
+
+
+def make_searcher(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # The corpus and caches live relative to the working directory
+    config = Config(str(tmp_path / "config.json"))
+    config.config["search"]["corpus"]["mode"] = "offline"
+    searcher = PaperSearcher(config)
+    searcher.corpus.add_papers([
+        ResearchPaper(title=f"Protein folding prediction at scale {i}", authors=["A. Author"], year=2022,
+                      abstract=f"Variant {i}: deep models for protein folding prediction now match "
+                               "experimental structures for most single-domain proteins.",
+                      url=f"u{i}")
+        for i in range(3)
+    ])
+    return searcher
+
+
+def test_topic_terms_leave_out_academic_padding():
+    refined = TopicRefiner.refine_topic(TOPIC)
+    assert TopicRefiner.topic_terms(TOPIC) == ["protein", "folding", "prediction"]
+    assert refined["search_terms"][3:] == ["research", "study", "analysis", "review"]
+
+
+def test_corpus_is_queried_with_topic_terms(tmp_path, monkeypatch):
+    searcher = make_searcher(tmp_path, monkeypatch)
+    refined = TopicRefiner.refine_topic(TOPIC)
+    search_query = " ".join(refined["search_terms"])
+    corpus_query = " ".join(TopicRefiner.topic_terms(TOPIC))
+
+    found = []
+    search_corpus = searcher._search_corpus
+    monkeypatch.setattr(searcher, "_search_corpus", lambda query: found.append(search_corpus(query)) or found[-1])
+
+    searcher.search_all_sources(search_query, corpus_query)
+    assert len(found) == 1 and len(found[0]) == 3  # Answered locally without the broader fallback
+    assert searcher.search_stats["by_source"]["corpus"] == 3
+    assert searcher.search_stats["total_found"] == 3
+
+
+def test_broader_fallback_updates_stats(tmp_path, monkeypatch):
+    searcher = make_searcher(tmp_path, monkeypatch)
+
+    # Nothing covers the full query; the three-term broader query finds the papers
+    searcher.search_all_sources("protein folding prediction quantum chemistry spectroscopy crystals")
+    assert searcher.search_stats["by_source"]["corpus"] == 3
+    assert searcher.search_stats["total_found"] == 3
@@ -0,0 +1,58 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from articlegenv3 import NearDuplicateIndex, ResearchPaper
+
+WORDS = ("model data network learning graph protein climate policy energy survey patient "
+         "treatment signal image language robust sample method effect region market").split()
+
+
+def make_paper(rng, index):
+    title = f"Study {index}: " + " ".join(rng.choices(WORDS, k=6))
+    abstract = " ".join(rng.choices(WORDS, k=80))
+    return ResearchPaper(title=title, authors=["A. Author"], year=2020, abstract=abstract, url=f"u{index}")
+
+
+def near_copy(rng, paper):
+    # Another source's record of the same work: a reworded title, so only MinHash/LSH can match it,
+    # and a few edited words in a truncated abstract
+    words = paper.abstract.split()
+    for position in rng.sample(range(len(words)), 2):
+        words[position] = rng.choice(WORDS)
+    return ResearchPaper(title=paper.title.split(": ", 1)[1].title(), authors=paper.authors, year=paper.year,
+                         abstract=" ".join(words[:-3]), url=paper.url + "-copy", source="arxiv")
+
+
+def test_near_duplicates_join_their_original_cluster():
+    rng = random.Random(7)
+    originals = [make_paper(rng, i) for i in range(40)]
+    index = NearDuplicateIndex()
+    clusters = [index.add(paper, i) for i, paper in enumerate(originals)]
+    assert clusters == list(range(40))  # Unrelated papers stay apart
+
+    copies = [index.add(near_copy(rng, paper), 100 + i) for i, paper in enumerate(originals)]
+    assert copies == list(range(40))
+
+
+def test_shared_doi_matches_despite_different_text():
+    index = NearDuplicateIndex()
+    first = ResearchPaper(title="Preprint title", authors=[], year=2021, abstract="one text", url="a",
+                          doi="10.1000/XYZ")
+    second = ResearchPaper(title="Published title", authors=[], year=2022, abstract="another text", url="b",
+                           doi="10.1000/xyz")
+    assert index.add(first, "first") == "first"
+    assert index.add(second, "second") == "first"
+
+
+def test_merge_prefers_published_record_and_fills_gaps():
+    preprint = ResearchPaper(title="T", authors=["A", "B", "C"], year=2021, abstract="long abstract text",
+                             url="a", venue="arXiv", arxiv_id="2101.00001", citations=3)
+    published = ResearchPaper(title="T", authors=["A"], year=2022, abstract="short", url="b",
+                              venue="Nature", doi="10.1/x", citations=10)
+    merged = NearDuplicateIndex.merge(preprint, published)
+    assert (merged.venue, merged.doi, merged.arxiv_id) == ("Nature", "10.1/x", "2101.00001")
+    assert merged.authors == ["A", "B", "C"]
+    assert merged.abstract == "long abstract text"
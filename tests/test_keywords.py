@@ -0,0 +1,36 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from articlegenv3 import ContentExtractor, KeywordMatcher
+
+
+def expected_counts(keywords, text):
+    counts = {k.lower(): text.lower().count(k.lower()) for k in keywords}
+    return {k: c for k, c in counts.items() if c}
+
+
+def test_matches_str_count_with_overlapping_keywords():
+    # Prefixes, repeats and overlaps: "aa" in "aaa" counts once, as str.count does
+    keywords = ["a", "aa", "ab", "aba", "b", "bab", "abab"]
+    rng = random.Random(3)
+    matcher = KeywordMatcher(keywords)
+    for _ in range(500):
+        text = "".join(rng.choices("abAB c", k=rng.randint(0, 40)))
+        assert matcher.count(text) == expected_counts(keywords, text), text
+
+
+def test_matches_str_count_with_default_dictionaries():
+    extractor = ContentExtractor()
+    keywords = extractor.theme_keywords + extractor.methodology_keywords + extractor.emerging_terms
+    text = ("Machine learning and deep learning models for healthcare: a systematic review and "
+            "meta-analysis of AI in medical diagnosis. Deep Learning data; IoT sustainability remote "
+            "learning for students, with regression analysis and statistical analysis.")
+    assert extractor.keyword_matcher.count(text) == expected_counts(keywords, text)
+
+
+def test_empty_inputs():
+    assert KeywordMatcher([]).count("anything") == {}
+    assert KeywordMatcher(["data"]).count("") == {}
@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from articlegenv3 import ArticleGenerator, Config, StreamValidator
+
+
+def test_stream_validator_aborts_on_uppercase_placeholder():
+    validator = StreamValidator(1000, ArticleGenerator.PLACEHOLDERS)
+    assert validator.feed("The results are clear. ") is None
+    assert validator.feed("TODO: add") == "placeholder"
+
+
+def test_stream_validator_finds_placeholder_split_across_deltas():
+    validator = StreamValidator(1000, ["[Insert"])
+    assert validator.feed("See [INS") is None
+    assert validator.feed("ERT citation]") == "placeholder"
+
+
+def test_validation_rejects_uppercase_placeholder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Caches and logs are created relative to the working directory
+    config = Config(str(tmp_path / "config.json"))
+    generator = ArticleGenerator(config)
+    content = "Academic prose about the topic. " * 30 + "TODO expand this paragraph."
+    assert generator._validation_failure(content, "abstract") == "placeholder"
+
+
+def test_short_draft_with_placeholder_is_not_reported_as_too_short(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generator = ArticleGenerator(Config(str(tmp_path / "config.json")))
+    content = "A short draft that stops here. [Insert the results of the survey.]"
+    assert generator._validation_failure(content, "abstract") == "placeholder"
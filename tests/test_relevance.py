@@ -0,0 +1,40 @@
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from articlegenv3 import BM25Scorer
+
+
+def test_bm25_matches_hand_computed_score():
+    scorer = BM25Scorer()
+    scores = scorer.score("graph", ["Graph graph model", "Neural model"], ["", ""])
+
+    # One query term in the titles: n = 2 documents, df = 1, lengths 3 and 2
+    idf = math.log(1 + (2 - 1 + 0.5) / (1 + 0.5))
+    norm = 1.5 * (1 - 0.75 + 0.75 * 3 / 2.5)
+    title_bm25 = 2 * (1.5 + 1) / (2 + norm) * idf
+    expected = 2.0 * title_bm25 + 5.0  # Title weight, plus the exact-phrase title boost
+    assert scores[0] == pytest.approx(expected)
+    assert scores[1] == 0.0
+
+
+def test_bm25_weights_abstract_matches_and_phrase_boost():
+    scorer = BM25Scorer()
+    titles = ["Unrelated title", "Unrelated title", "Unrelated title"]
+    abstracts = ["deep learning for proteins", "learning deep for proteins", "nothing relevant here"]
+    scores = scorer.score("deep learning", titles, abstracts)
+
+    # Same terms and lengths, but only the first abstract contains the exact phrase
+    assert scores[0] - scores[1] == pytest.approx(2.0)
+    assert scores[2] == 0.0
+
+
+def test_bm25_handles_empty_inputs():
+    scorer = BM25Scorer()
+    assert len(scorer.score("graph", [], [])) == 0
+    assert scorer.score("", ["Graph"], ["graph"]).tolist() == [0.0]
+
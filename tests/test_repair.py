@@ -0,0 +1,68 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from articlegenv3 import ArticleGenerator, Config, StubProvider
+
+MESSAGES = [
+    {"role": "system", "content": "You are an expert academic writer."},
+    {"role": "user", "content": 'Write the abstract for "protein folding" in approximately 250 words.'},
+]
+
+
+def make_generator(tmp_path, monkeypatch, **stub):
+    monkeypatch.chdir(tmp_path)
+    config = Config(str(tmp_path / "config.json"), provider="stub")
+    config.config["generation"]["stub"].update({"latency_ms": 0, **stub})
+    return ArticleGenerator(config, provider=StubProvider(config))
+
+
+def paragraphs(count, words):
+    return "\n\n".join(" ".join(f"w{p}x{i}" for i in range(words)) for p in range(count))
+
+
+def repair(generator, content):
+    failure = generator._validation_failure(content, "abstract")
+    return generator._repair("abstract", generator.model, MESSAGES, 1.0, content, failure, {})
+
+
+def test_short_section_is_continued(tmp_path, monkeypatch):
+    generator = make_generator(tmp_path, monkeypatch)
+    draft = paragraphs(2, 30)
+
+    content, failure = repair(generator, draft)
+    assert failure is None
+    assert content.startswith(draft + "\n\n")
+    assert 100 <= len(content.split()) <= 2500
+    assert generator.get_section_stats()["abstract"]["continuations"] == 1
+    assert generator.get_usage_stats()["requests"] == 1
+
+
+def test_continuations_stop_at_the_limit(tmp_path, monkeypatch):
+    generator = make_generator(tmp_path, monkeypatch, words=5)  # Every continuation is one short sentence
+
+    content, failure = repair(generator, paragraphs(1, 20))
+    assert failure == "too_short"
+    assert generator.get_section_stats()["abstract"]["continuations"] == 2  # repair.max_continuations
+    assert generator.get_usage_stats()["requests"] == 2
+
+
+def test_long_section_is_trimmed_locally(tmp_path, monkeypatch):
+    generator = make_generator(tmp_path, monkeypatch)
+    generator.config.config["quality"].update({"min_section_words": 50, "max_section_words": 100})
+
+    content, failure = repair(generator, paragraphs(5, 30))
+    assert failure is None
+    assert content == paragraphs(3, 30)  # Whole leading paragraphs up to the limit
+    assert generator.get_section_stats()["abstract"]["trims"] == 1
+    assert generator.get_usage_stats()["requests"] == 0
+
+
+def test_short_draft_with_placeholder_is_not_extended(tmp_path, monkeypatch):
+    generator = make_generator(tmp_path, monkeypatch)
+
+    content, failure = repair(generator, paragraphs(1, 20) + " [Insert results here]")
+    assert failure == "placeholder"
+    assert "abstract" not in generator.get_section_stats()
+    assert generator.get_usage_stats()["requests"] == 0
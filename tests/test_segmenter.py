@@ -0,0 +1,39 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from articlegenv3 import RuleBasedSegmenter
+
+
+@pytest.mark.parametrize("sentences", [
+    # Ambiguous abbreviations end a sentence before a capitalized word
+    ["The answer is no.", "We found nothing."],
+    ["Data came from Acme Inc.", "The firm agreed."],
+    # ...and continue it before a number or lowercase text
+    ["Following Smith et al. (2019), we model demand.", "It works."],
+    ["See No. 5 and Fig. 3 for details.", "Then stop."],
+    ["Results held at min. 3 sites and max. 9 sites.", "Costs fell."],
+    # A capital letter is an initial unless a sentence opener follows it
+    ["Smith et al. found X.", "We then tested Y."],
+    ["We study A. B.", "Next we test."],
+    ["J. A. Smith and U.S. agencies agree.", "The end."],
+    # Unambiguous abbreviations never end a sentence
+    ["Optimizers, e.g. Adam, converged.", "Loss fell by 12.4% vs. baseline."],
+])
+def test_boundaries(sentences):
+    assert RuleBasedSegmenter().split(" ".join(sentences)) == sentences
+
+
+def test_labelled_benchmark_fixtures():
+    segmenter = RuleBasedSegmenter()
+    with open(ROOT / "benchmarks" / "segmenter_abstracts.jsonl", "r", encoding="utf-8") as f:
+        fixtures = [json.loads(line) for line in f if line.strip()]
+    labelled = [fixture for fixture in fixtures if "sentences" in fixture]
+    assert labelled
+    for fixture in labelled:
+        assert segmenter.split(fixture["abstract"]) == fixture["sentences"]